@@ -1,7 +1,7 @@
 #!/bin/bash
 if [[ "${1:-}" == "-a" || "${1:-}" == "--author" ]]; then
   echo "Author: FoxSecIntel"
-  echo "Repository: https://github.com/FoxSecIntel/BGP-Intel
+  echo "Repository: https://github.com/FoxSecIntel/BGP-Intel"
   echo "Tool: asn-lookup.sh"
   exit 0
 fi
@@ -50,9 +50,40 @@ fi
 
 ip_address="$arg"
 [[ "$ip_address" =~ ^([0-9]{1,3}\.){3}[0-9]{1,3}$ ]] || { echo "Invalid IPv4 address"; exit 1; }
-command -v whois >/dev/null 2>&1 || { echo "whois command not found"; exit 1; }
 
-asn_out="$(whois -h v4.whois.cymru.com " -v $ip_address" 2>/dev/null || true)"
+CYMRU_HEADER="AS      | IP               | BGP Prefix          | CC | Registry | Allocated  | AS Name"
+
+# Query Cymru over port 43 directly with bulk framing, no whois binary fork needed.
+# The exchange runs under timeout so a filtered port 43 cannot hang the lookup, and the
+# bulk-mode banner is dropped so the output matches plain whois.
+cymru_query() {
+  command -v timeout >/dev/null 2>&1 || return 1
+  timeout 5 bash -c 'exec 3<>"/dev/tcp/v4.whois.cymru.com/43" || exit 1
+    printf "begin\nverbose\n%s\nend\n" "$1" >&3
+    cat <&3' _ "$1" | sed '/^Bulk mode;/d'
+}
+
+# getent resolves the PTR through libc (gethostbyaddr), no text parsing of host output.
+reverse_lookup() {
+  if command -v getent >/dev/null 2>&1; then
+    getent hosts "$1" 2>/dev/null | awk 'NR == 1 {print $2}'
+  elif command -v host >/dev/null 2>&1; then
+    host "$1" 2>/dev/null | sed -n 's/.*pointer \(.*\)\./\1/p' | head -n1
+  fi
+}
+
+# Run the PTR lookup alongside the whois query, they are independent round-trips.
+rev_file="$(mktemp)"
+trap 'rm -f "$rev_file"' EXIT
+reverse_lookup "$ip_address" >"$rev_file" 2>/dev/null &
+rev_pid=$!
+
+asn_out="$(cymru_query "$ip_address" 2>/dev/null || true)"
+if [[ -n "$asn_out" ]]; then
+  asn_out="$CYMRU_HEADER"$'\n'"$asn_out"
+elif command -v whois >/dev/null 2>&1; then
+  asn_out="$(whois -h v4.whois.cymru.com "-v $ip_address" 2>/dev/null || true)"
+fi
 [[ -n "$asn_out" ]] || { echo "ASN not found for IP address: $ip_address"; exit 1; }
 
 asn_line="$(printf '%s\n' "$asn_out" | sed -n '2p' || true)"
@@ -60,10 +91,8 @@ asn="$(echo "$asn_line" | awk '{print $1}')"
 cc="$(echo "$asn_line" | awk '{print $3}')"
 owner="$(echo "$asn_line" | awk '{$1=$2=$3=$4=""; print $0}' | xargs)"
 
-host_name=""
-if command -v host >/dev/null 2>&1; then
-  host_name="$(host "$ip_address" 2>/dev/null | sed -n 's/.*pointer \(.*\)\./\1/p' | head -n1 || true)"
-fi
+wait "$rev_pid" 2>/dev/null || true
+host_name="$(head -n1 "$rev_file")"
 
 if $json; then
   jq -n --arg ip "$ip_address" --arg asn "$asn" --arg cc "$cc" --arg owner "$owner" --arg host "$host_name" \
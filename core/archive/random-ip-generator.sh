@@ -1,7 +1,7 @@
 #!/bin/bash
 if [[ "${1:-}" == "-a" || "${1:-}" == "--author" ]]; then
   echo "Author: FoxSecIntel"
-  echo "Repository: https://github.com/FoxSecIntel/BGP-Intel
+  echo "Repository: https://github.com/FoxSecIntel/BGP-Intel"
   echo "Tool: random-ip-generator.sh"
   exit 0
 fi
@@ -22,18 +22,23 @@ fi
 num_ips=$1
 
 # Loop to generate the specified number of IP addresses
+ips=()
 for ((i=1; i<=$num_ips; i++))
 do
-  # Generate random IP address
+  # Generate random IP address, skipping RFC1918 private ranges: 10/8, 172.16/12, 192.168/16
   while :
   do
-    ip="$((RANDOM%256)).$((RANDOM%256)).$((RANDOM%256)).$((RANDOM%256))"
-    if [[ $ip =~ ^(10|172|192)\. ]]; then
+    a=$((RANDOM%256)) b=$((RANDOM%256))
+    if (( a == 10 || (a == 172 && b >= 16 && b <= 31) || (a == 192 && b == 168) )); then
         continue
     else
         break
     fi
   done
-  # Print the generated IP address
-  echo $ip
+  ips+=("$a.$b.$((RANDOM%256)).$((RANDOM%256))")
 done
+
+# Print all generated IP addresses in one write
+if (( ${#ips[@]} > 0 )); then
+  printf '%s\n' "${ips[@]}"
+fi
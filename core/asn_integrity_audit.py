@@ -11,14 +11,27 @@ from __future__ import annotations
 import base64
 
 import argparse
+import functools
+import heapq
 import json
 import ipaddress
-import re
+import sqlite3
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any, Dict, List
 
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional JSON accelerator
+    orjson = None
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
@@ -29,6 +42,8 @@ if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
 
 USER_AGENT = "ASN-Intel-Audit/1.1"
 TIMEOUT_SECONDS = 5
+CACHE_TTL_SECONDS = 3600
+CACHE_PATH = Path.home() / ".cache" / "bgp-intel" / "http_cache"
 
 AS_OVERVIEW_URL = "https://stat.ripe.net/data/as-overview/data.json"
 ANNOUNCED_PREFIXES_URL = "https://stat.ripe.net/data/announced-prefixes/data.json"
@@ -37,7 +52,47 @@ RIS_FIRST_LAST_SEEN_URL = "https://stat.ripe.net/data/ris-first-last-seen/data.j
 PREFIX_OVERVIEW_URL = "https://stat.ripe.net/data/prefix-overview/data.json"
 
 HIGH_RISK_COUNTRIES = {"RU", "CN", "IR", "KP", "SY"}
-COUNTRY_TAIL_RE = re.compile(r",\s*([A-Z]{2})\s*$")
+AS_TRANS = 23456
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _build_session(use_cache: bool) -> requests.Session:
+    session = requests.Session()
+    if use_cache:
+        try:
+            session = requests_cache.CachedSession(
+                str(CACHE_PATH),
+                backend="sqlite",
+                expire_after=CACHE_TTL_SECONDS,
+                allowable_methods=("GET",),
+                stale_if_error=True,
+            )
+        except (OSError, sqlite3.Error):
+            # Cache directory is not writable; run uncached rather than fail.
+            pass
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+        ),
+    )
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def _session(use_cache: bool = True) -> requests.Session:
+    # main builds it after argument parsing, so --no-cache never opens the cache file.
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session(use_cache)
+    return _SESSION
+
 
 ANSI_RESET = "\033[0m"
 ANSI_BOLD = "\033[1m"
@@ -45,11 +100,23 @@ ANSI_RED = "\033[31m"
 ANSI_GREEN = "\033[32m"
 
 
+@functools.lru_cache(maxsize=2048)
 def normalise_asn(value: str) -> str:
-    v = value.strip().upper()
+    v = value.strip()
+    if v[:2] == "AS" and v.isupper():
+        return v
+    v = v.upper()
     return v if v.startswith("AS") else f"AS{v}"
 
 
+def is_routable_asn(asn: str) -> bool:
+    number = asn[2:] if asn.startswith("AS") else asn
+    if not (number.isascii() and number.isdigit()):
+        return False
+    value = int(number)
+    return 0 < value < 2**32 and value != AS_TRANS
+
+
 def is_ip_resource(value: str) -> bool:
     try:
         ipaddress.ip_address(value.strip())
@@ -58,15 +125,17 @@ def is_ip_resource(value: str) -> bool:
         return False
 
 
+def _loads(payload: bytes) -> Any:
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
 def resolve_asn_from_ip(ip: str) -> str:
-    headers = {"User-Agent": USER_AGENT}
-    response = requests.get(PREFIX_OVERVIEW_URL, params={"resource": ip}, headers=headers, timeout=TIMEOUT_SECONDS)
+    response = _session().get(PREFIX_OVERVIEW_URL, params={"resource": ip}, timeout=TIMEOUT_SECONDS)
     response.raise_for_status()
-    data = response.json().get("data", {})
+    data = _loads(response.content).get("data", {})
     asns = data.get("asns", [])
     if isinstance(asns, list) and asns:
-        first = asns[0] if isinstance(asns[0], dict) else {}
-        asn = first.get("asn")
+        asn = asns[0].get("asn") if isinstance(asns[0], dict) else None
         if asn is not None:
             return normalise_asn(str(asn))
     raise RuntimeError(f"No ASN mapping found for IP: {ip}")
@@ -82,25 +151,48 @@ def parse_iso_time(value: str) -> datetime | None:
         return None
 
 
+def _nested(d: Dict[str, Any], k1: str, k2: str, default: Any = "") -> Any:
+    v = d.get(k1)
+    return v.get(k2, default) if isinstance(v, dict) else default
+
+
 def fetch_json(url: str, asn: str) -> Dict[str, Any]:
-    headers = {"User-Agent": USER_AGENT}
-    response = requests.get(url, params={"resource": asn}, headers=headers, timeout=TIMEOUT_SECONDS)
+    response = _session().get(url, params={"resource": asn}, timeout=TIMEOUT_SECONDS)
     response.raise_for_status()
-    return response.json().get("data", {})
+    return _loads(response.content).get("data", {})
+
+
+def fetch_json_many(urls: List[str], asn: str) -> Dict[str, Dict[str, Any]]:
+    # A failing endpoint degrades to an empty payload; only a total outage is raised.
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: List[Exception] = []
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        futures = {url: pool.submit(fetch_json, url, asn) for url in urls}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except Exception as exc:
+                errors.append(exc)
+                results[url] = {}
+    if errors and len(errors) == len(urls):
+        raise errors[0]
+    return results
 
 
 def infer_registration_country(holder: str) -> str:
-    match = COUNTRY_TAIL_RE.search(holder or "")
-    if match:
-        return match.group(1)
+    # Inline form of ",\s*([A-Z]{2})\s*$": a comma, optional spaces, then a two-letter code.
+    text = (holder or "").rstrip()
+    code = text[-2:]
+    if len(code) == 2 and code.isascii() and code.isalpha() and code.isupper():
+        if text[:-2].rstrip().endswith(","):
+            return code
     return "UNKNOWN"
 
 
 def get_upstreams(neighbours: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    left = [n for n in neighbours if str(n.get("type", "")).lower() == "left"]
-    left.sort(key=lambda x: int(x.get("power", 0)), reverse=True)
+    left = (n for n in neighbours if isinstance(n, dict) and str(n.get("type", "")).lower() == "left")
     out: List[Dict[str, Any]] = []
-    for n in left[:3]:
+    for n in heapq.nlargest(3, left, key=lambda x: int(x.get("power", 0))):
         out.append(
             {
                 "asn": normalise_asn(str(n.get("asn", "UNKNOWN"))),
@@ -116,12 +208,18 @@ def analyse_asn(resource_input: str) -> Dict[str, Any]:
     raw = resource_input.strip()
     resolved_from_ip = is_ip_resource(raw)
     asn = resolve_asn_from_ip(raw) if resolved_from_ip else normalise_asn(raw)
+    if not is_routable_asn(asn):
+        raise ValueError(f"Not a routable ASN: {asn}")
 
     # Initialising data collection, Analysing RIPEstat sources.
-    overview = fetch_json(AS_OVERVIEW_URL, asn)
-    announced = fetch_json(ANNOUNCED_PREFIXES_URL, asn)
-    neighbours = fetch_json(ASN_NEIGHBOURS_URL, asn)
-    first_last_seen = fetch_json(RIS_FIRST_LAST_SEEN_URL, asn)
+    payloads = fetch_json_many(
+        [AS_OVERVIEW_URL, ANNOUNCED_PREFIXES_URL, ASN_NEIGHBOURS_URL, RIS_FIRST_LAST_SEEN_URL],
+        asn,
+    )
+    overview = payloads[AS_OVERVIEW_URL]
+    announced = payloads[ANNOUNCED_PREFIXES_URL]
+    neighbours = payloads[ASN_NEIGHBOURS_URL]
+    first_last_seen = payloads[RIS_FIRST_LAST_SEEN_URL]
 
     holder = str(overview.get("holder") or "UNKNOWN")
     announced_status = bool(overview.get("announced", False))
@@ -136,31 +234,33 @@ def analyse_asn(resource_input: str) -> Dict[str, Any]:
     resources = first_last_seen.get("resources", [])
     first_seen_time = "UNKNOWN"
     last_seen_time = "UNKNOWN"
+    first_seen_dt: datetime | None = None
 
     if isinstance(resources, list) and resources:
-        times = []
+        # Compare parsed datetimes so mixed offsets order correctly; report the original strings.
+        first_min: tuple[datetime, str] | None = None
+        last_max: tuple[datetime, str] | None = None
         for r in resources:
             if not isinstance(r, dict):
                 continue
-            first = str((r.get("first") or {}).get("time") or "")
-            last = str((r.get("last") or {}).get("time") or "")
-            if first:
-                times.append(("first", first))
-            if last:
-                times.append(("last", last))
-
-        first_candidates = [t for k, t in times if k == "first"]
-        last_candidates = [t for k, t in times if k == "last"]
-        if first_candidates:
-            first_seen_time = min(first_candidates)
-        if last_candidates:
-            last_seen_time = max(last_candidates)
+            first = str(_nested(r, "first", "time") or "")
+            last = str(_nested(r, "last", "time") or "")
+            first_dt = parse_iso_time(first) if first else None
+            last_dt = parse_iso_time(last) if last else None
+            if first_dt is not None and (first_min is None or first_dt < first_min[0]):
+                first_min = (first_dt, first)
+            if last_dt is not None and (last_max is None or last_dt > last_max[0]):
+                last_max = (last_dt, last)
+
+        if first_min is not None:
+            first_seen_dt, first_seen_time = first_min
+        if last_max is not None:
+            last_seen_time = last_max[1]
 
     registration_country = infer_registration_country(holder)
     is_high_risk = registration_country in HIGH_RISK_COUNTRIES
 
     newly_established = False
-    first_seen_dt = parse_iso_time(first_seen_time) if first_seen_time != "UNKNOWN" else None
     if first_seen_dt is not None:
         now = datetime.now(timezone.utc)
         newly_established = first_seen_dt >= (now - timedelta(days=365))
@@ -190,7 +290,9 @@ def main() -> int:
     parser = argparse.ArgumentParser(description="Initialising ASN Network Integrity Auditor")
     parser.add_argument("resource", help="ASN or IP value, for example AS15169, 15169, or 8.8.8.8")
     parser.add_argument("--json", action="store_true", help="Output machine-readable JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local RIPEstat response cache")
     args = parser.parse_args()
+    _session(use_cache=not args.no_cache)
 
     try:
         result = analyse_asn(args.resource)
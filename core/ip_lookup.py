@@ -13,11 +13,28 @@ from __future__ import annotations
 import base64
 
 import argparse
+import ipaddress
 import json
+import random
+import re
+import sqlite3
 import sys
-from typing import Any, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
 
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional JSON accelerator
+    orjson = None
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
@@ -28,13 +45,43 @@ if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
 
 USER_AGENT = "IP-Intel-Audit/1.1"
 TIMEOUT_SECONDS = 5
+CACHE_TTL_SECONDS = 3600
+CACHE_PATH = Path.home() / ".cache" / "bgp-intel" / "http_cache"
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 30.0
+MAX_RETRIES = 5
+BATCH_MAX_WORKERS = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 PREFIX_OVERVIEW_URL = "https://stat.ripe.net/data/prefix-overview/data.json"
 RIR_STATS_COUNTRY_URL = "https://stat.ripe.net/data/rir-stats-country/data.json"
 ABUSE_CONTACT_URL = "https://stat.ripe.net/data/abuse-contact-finder/data.json"
 
+# Report keys produced by each selectable field, and the endpoints each field needs.
+FIELD_KEYS = {
+    "asn": ("asn",),
+    "holder": ("holder", "is_cloud", "is_anonymised"),
+    "country": ("country", "country_name", "is_high_risk"),
+    "abuse": ("abuse_email",),
+    "rir": ("rir",),
+}
+ALL_FIELDS = frozenset(FIELD_KEYS)
+ENDPOINT_FIELDS = (
+    (PREFIX_OVERVIEW_URL, frozenset({"asn", "holder", "rir"})),
+    (RIR_STATS_COUNTRY_URL, frozenset({"country"})),
+    (ABUSE_CONTACT_URL, frozenset({"abuse", "rir"})),
+)
+
 HIGH_RISK_COUNTRIES = {"RU", "CN", "IR", "KP", "SY"}
-CLOUD_INDICATORS = ("AWS", "AMAZON", "GOOGLE", "AZURE", "HETZNER", "DIGITALOCEAN", "OVH")
-ANONYMISER_INDICATORS = ("VPN", "PROXY", "TOR", "MULLVAD")
+CLOUD_INDICATORS = frozenset({"AWS", "AMAZON", "GOOGLE", "AZURE", "HETZNER", "DIGITALOCEAN", "OVH"})
+# Anonymiser brands fuse the keyword into one word (NORDVPN, PROTONVPN, TORSERVERS-NET), so these
+# match anywhere inside a token, and TOR only at the start of one, which keeps HISTORY and DIRECTOR clean.
+ANONYMISER_INFIXES = ("VPN", "PROXY", "MULLVAD")
+ANONYMISER_PREFIXES = ("TOR",)
+RIR_CODES = ("AFRINIC", "APNIC", "ARIN", "LACNIC", "RIPE")
+TOKEN_RE = re.compile(r"[A-Z0-9]+")
+# One alternation, so a block description is scanned once instead of once per RIR.
+RIR_PATTERN = re.compile("|".join(RIR_CODES), re.IGNORECASE)
+_SHAPE_ERRORS = (AttributeError, IndexError, KeyError, TypeError)
 
 COUNTRY_NAMES = {
     "GB": "United Kingdom",
@@ -67,34 +114,127 @@ RIR_DISPLAY_NAMES = {
     "UNKNOWN": "UNKNOWN",
 }
 
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _build_session(use_cache: bool) -> requests.Session:
+    session = requests.Session()
+    if use_cache:
+        try:
+            session = requests_cache.CachedSession(
+                str(CACHE_PATH),
+                backend="sqlite",
+                expire_after=CACHE_TTL_SECONDS,
+                allowable_methods=("GET",),
+                stale_if_error=True,
+            )
+        except (OSError, sqlite3.Error):
+            # Cache directory is not writable; run uncached rather than fail.
+            pass
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            # Status-driven retries (429/5xx) are handled with jitter in _get_with_backoff.
+            max_retries=Retry(total=3, backoff_factor=1, allowed_methods=["GET"]),
+        ),
+    )
+    # Advertise every encoding urllib3 can decode here: gzip/deflate, plus br when brotli is installed.
+    session.headers.update({"User-Agent": USER_AGENT, **make_headers(accept_encoding=True)})
+    return session
+
+
+def _session(use_cache: bool = True) -> requests.Session:
+    # Built on first use, so --help and --no-cache never open the on-disk cache.
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session(use_cache)
+    return _SESSION
+
+
 ANSI_RESET = "\033[0m"
 ANSI_BOLD = "\033[1m"
 ANSI_RED = "\033[31m"
 ANSI_GREEN = "\033[32m"
 
 
+def _retry_after_seconds(response: requests.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 0.0
+
+
+def _get_with_backoff(url: str, params: Dict[str, str]) -> requests.Response:
+    for attempt in range(MAX_RETRIES + 1):
+        response = _session().get(url, params=params, timeout=TIMEOUT_SECONDS)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        # Exponential backoff with jitter, never shorter than the server's Retry-After.
+        delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_SECONDS * 2**attempt) * random.uniform(0.5, 1.0)
+        time.sleep(max(delay, _retry_after_seconds(response)))
+    return response
+
+
+def _loads(payload: bytes) -> Any:
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+
+def _ascii(text: str) -> str:
+    return _NON_ASCII_RE.sub(lambda m: json.dumps(m.group())[1:-1], text)
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        return _ascii(orjson.dumps(obj).decode("utf-8"))
+    return json.dumps(obj, separators=(",", ":"))
+
+
 def fetch_json(url: str, ip: str) -> Dict[str, Any]:
-    headers = {"User-Agent": USER_AGENT}
-    response = requests.get(url, params={"resource": ip}, headers=headers, timeout=TIMEOUT_SECONDS)
+    response = _get_with_backoff(url, {"resource": ip})
     response.raise_for_status()
-    return response.json()
+    return _loads(response.content)
 
 
-def contains_indicator(text: str, indicators: tuple[str, ...]) -> bool:
-    upper = text.upper()
-    return any(indicator in upper for indicator in indicators)
+def fetch_json_many(urls: List[str], ip: str) -> Dict[str, Dict[str, Any]]:
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        futures = {url: pool.submit(fetch_json, url, ip) for url in urls}
+        return {url: future.result() for url, future in futures.items()}
+
+
+def tokenise(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.upper())
+
+
+def contains_indicator(tokens: List[str], indicators: frozenset[str]) -> bool:
+    # Whole-token match; cloud holders name the provider as its own word (AMAZON-02, HETZNER-AS).
+    return not indicators.isdisjoint(tokens)
+
+
+def is_anonymiser(tokens: List[str]) -> bool:
+    return any(
+        token.startswith(ANONYMISER_PREFIXES) or any(infix in token for infix in ANONYMISER_INFIXES)
+        for token in tokens
+    )
 
 
 def extract_rir(prefix_data: Dict[str, Any], abuse_data: Dict[str, Any]) -> str:
     authoritative_rir = str(abuse_data.get("authoritative_rir") or "").upper()
-    if authoritative_rir in {"AFRINIC", "APNIC", "ARIN", "LACNIC", "RIPE"}:
+    if authoritative_rir in RIR_CODES:
         return authoritative_rir
 
     block = prefix_data.get("block", {})
     block_desc = str(block.get("desc") or "") if isinstance(block, dict) else ""
-    upper = block_desc.upper()
-    for rir in ("AFRINIC", "APNIC", "ARIN", "LACNIC", "RIPE"):
-        if rir in upper:
+    found = {match.upper() for match in RIR_PATTERN.findall(block_desc)}
+    for rir in RIR_CODES:
+        if rir in found:
             return rir
     return "UNKNOWN"
 
@@ -108,52 +248,57 @@ def colour(text: str, *, red: bool) -> str:
     return f"{c}{text}{ANSI_RESET}"
 
 
-def analyse_ip(ip: str) -> Dict[str, Any]:
-    # Initialising collection, Analysing RIPEstat intelligence sources.
-    prefix_payload = fetch_json(PREFIX_OVERVIEW_URL, ip)
-    country_payload = fetch_json(RIR_STATS_COUNTRY_URL, ip)
-    abuse_payload = fetch_json(ABUSE_CONTACT_URL, ip)
+def parse_fields(value: str) -> frozenset[str]:
+    fields = frozenset(f.strip().lower() for f in value.split(",") if f.strip())
+    unknown = fields - ALL_FIELDS
+    if not fields or unknown:
+        raise argparse.ArgumentTypeError(
+            f"Fields must be a comma-separated subset of: {', '.join(FIELD_KEYS)}"
+        )
+    return fields
 
-    prefix_data = prefix_payload.get("data", {})
-    asns = prefix_data.get("asns", [])
 
-    asn_value = "UNKNOWN"
-    holder = "UNKNOWN"
-    if isinstance(asns, list) and asns:
-        first = asns[0] if isinstance(asns[0], dict) else {}
-        asn_raw = first.get("asn")
+def analyse_ip(ip: str, fields: frozenset[str] = ALL_FIELDS) -> Dict[str, Any]:
+    # Initialising collection, Analysing RIPEstat intelligence sources.
+    # Only the endpoints behind the requested fields are queried.
+    urls = [url for url, needs in ENDPOINT_FIELDS if not needs.isdisjoint(fields)]
+    payloads = fetch_json_many(urls, ip)
+    prefix_payload = payloads.get(PREFIX_OVERVIEW_URL, {})
+    country_payload = payloads.get(RIR_STATS_COUNTRY_URL, {})
+    abuse_payload = payloads.get(ABUSE_CONTACT_URL, {})
+
+    prefix_data = prefix_payload.get("data") or {}
+    # RIPEstat shapes are stable; malformed or empty payloads fall back to UNKNOWN via the except.
+    try:
+        first = prefix_data["asns"][0]
         holder = str(first.get("holder") or "UNKNOWN")
-        if asn_raw is not None:
-            asn_value = str(asn_raw)
-
-    country = "UNKNOWN"
-    country_data = country_payload.get("data", {})
-    located = country_data.get("located_resources", [])
-    if isinstance(located, list) and located:
-        first_loc = located[0] if isinstance(located[0], dict) else {}
-        code = first_loc.get("location")
-        if isinstance(code, str) and code:
-            country = code.upper()
-
-    abuse_email = "UNKNOWN"
-    abuse_data = abuse_payload.get("data", {})
-    abuse_contacts = abuse_data.get("abuse_contacts", [])
-    if isinstance(abuse_contacts, list) and abuse_contacts:
-        first_contact = abuse_contacts[0]
-        if isinstance(first_contact, str) and first_contact.strip():
-            abuse_email = first_contact.strip()
+        asn_raw = first.get("asn")
+        asn_value = "UNKNOWN" if asn_raw is None else str(asn_raw)
+    except _SHAPE_ERRORS:
+        asn_value = holder = "UNKNOWN"
+
+    try:
+        country = country_payload["data"]["located_resources"][0]["location"].upper() or "UNKNOWN"
+    except _SHAPE_ERRORS:
+        country = "UNKNOWN"
+
+    abuse_data = abuse_payload.get("data") or {}
+    try:
+        abuse_email = abuse_data["abuse_contacts"][0].strip() or "UNKNOWN"
+    except _SHAPE_ERRORS:
+        abuse_email = "UNKNOWN"
 
     usage_type = str(prefix_data.get("type") or "unknown")
-    detection_text = f"{holder} {usage_type}"
+    holder_tokens = tokenise(holder)
 
     is_high_risk = country in HIGH_RISK_COUNTRIES
-    is_cloud = contains_indicator(holder, CLOUD_INDICATORS)
-    is_anonymised = contains_indicator(detection_text, ANONYMISER_INDICATORS)
+    is_cloud = contains_indicator(holder_tokens, CLOUD_INDICATORS)
+    is_anonymised = is_anonymiser(holder_tokens + tokenise(usage_type))
     country_name = COUNTRY_NAMES.get(country, "Unknown")
     rir_code = extract_rir(prefix_data, abuse_data)
     rir_name = RIR_DISPLAY_NAMES.get(rir_code, rir_code)
 
-    return {
+    result = {
         "ip": ip,
         "asn": asn_value,
         "holder": holder,
@@ -165,33 +310,118 @@ def analyse_ip(ip: str) -> Dict[str, Any]:
         "is_anonymised": is_anonymised,
         "abuse_email": abuse_email,
     }
+    if fields == ALL_FIELDS:
+        return result
+    keep = {"ip", *(key for field in fields for key in FIELD_KEYS[field])}
+    return {key: value for key, value in result.items() if key in keep}
+
+
+def _analyse_batch_entry(ip: str, fields: frozenset[str] = ALL_FIELDS) -> Dict[str, Any]:
+    try:
+        ipaddress.ip_address(ip)
+    except ValueError:
+        return {"ip": ip, "error": "invalid_ip"}
+    try:
+        return analyse_ip(ip, fields)
+    except requests.exceptions.RequestException as exc:
+        return {"ip": ip, "error": "request_failed", "details": str(exc)}
+    except Exception as exc:
+        return {"ip": ip, "error": str(exc)}
+
+
+def analyse_ips(
+    ips: List[str],
+    *,
+    workers: int = BATCH_MAX_WORKERS,
+    fields: frozenset[str] = ALL_FIELDS,
+) -> Dict[str, Dict[str, Any]]:
+    return dict(iter_analyse_ips(ips, workers=workers, fields=fields))
+
+
+def iter_analyse_ips(
+    ips: List[str],
+    *,
+    workers: int = BATCH_MAX_WORKERS,
+    fields: frozenset[str] = ALL_FIELDS,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    # Yields in input order as soon as each result is ready; duplicate IPs are analysed once
+    # and a bounded pool of workers shares the pooled session.
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {ip: pool.submit(_analyse_batch_entry, ip, fields) for ip in dict.fromkeys(ips)}
+        for ip in ips:
+            yield ip, pending[ip].result()
+
+
+def load_ips(lines: List[str]) -> List[str]:
+    stripped = [l.strip() for l in lines]
+    return [l for l in stripped if l and not l.startswith("#")]
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Initialising SOC IP intelligence auditor")
-    parser.add_argument("ip", help="IP address to analyse")
+    parser.add_argument("ip", nargs="?", help="IP address to analyse")
     parser.add_argument("--json", action="store_true", help="Output a single JSON object")
+    parser.add_argument("--ips-file", help="Analyse one IP per line; output is always NDJSON (one JSON object per line)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local RIPEstat response cache")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BATCH_MAX_WORKERS,
+        help=f"Concurrent IP lookups in batch mode (default: {BATCH_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--fields",
+        type=parse_fields,
+        default=ALL_FIELDS,
+        help=f"Comma-separated JSON fields to collect, skipping unneeded lookups ({','.join(FIELD_KEYS)})",
+    )
     args = parser.parse_args()
 
+    if args.ips_file and args.ip:
+        parser.error("--ips-file cannot be combined with an IP address")
+    _session(use_cache=not args.no_cache)
+
+    batch: List[str] | None = None
+    if args.ips_file:
+        path = Path(args.ips_file)
+        if not path.exists():
+            print(f"Input file not found: {path}", file=sys.stderr)
+            return 1
+        batch = load_ips(path.read_text(encoding="utf-8", errors="ignore").splitlines())
+    elif args.ip is None and not sys.stdin.isatty():
+        batch = load_ips(sys.stdin.read().splitlines()) or None
+
+    if batch is not None:
+        if args.json:
+            parser.error("Batch input always writes NDJSON; drop --json")
+        for _, result in iter_analyse_ips(batch, workers=args.workers, fields=args.fields):
+            print(_dumps(result), flush=True)
+        return 0
+
+    if not args.ip:
+        parser.error("Provide an IP address, --ips-file, or pipe IPs on stdin")
+    if args.fields != ALL_FIELDS and not args.json:
+        parser.error("--fields requires --json or batch input")
+
     try:
-        result = analyse_ip(args.ip)
+        result = analyse_ip(args.ip, args.fields)
     except requests.exceptions.RequestException as exc:
         message = "Authorised request failed, network or RIPEstat service is unreachable."
         if args.json:
-            print(json.dumps({"error": message, "details": str(exc)}, separators=(",", ":")))
+            print(_dumps({"error": message, "details": str(exc)}))
         else:
             print(message)
             print(f"Details: {exc}")
         return 1
     except Exception as exc:
         if args.json:
-            print(json.dumps({"error": str(exc)}, separators=(",", ":")))
+            print(_dumps({"error": str(exc)}))
         else:
             print(f"Analysis failed: {exc}")
         return 1
 
     if args.json:
-        print(json.dumps(result, separators=(",", ":")))
+        print(_dumps(result))
         return 0
 
     top_border = "==============================================================="
@@ -207,27 +437,31 @@ def main() -> int:
     infra_type = "Cloud / Data Centre" if result["is_cloud"] else "Residential / Consumer ISP"
     privacy_text = "Proxy/VPN indicators detected" if result["is_anonymised"] else "No Proxy/VPN detected"
 
-    print(top_border)
-    print(f"🔍 IP INTEL REPORT: {bold(result['ip'])}")
-    print(top_border)
-    print()
-    print("📊 RISK PROFILE")
-    print(section_border)
-    print(jurisdiction_coloured)
-    print(f"[🏠] TYPE        : {infra_type}")
-    print(f"[🛡️] PRIVACY     : {privacy_text}")
-    print()
-    print("🏢 NETWORK IDENTITY")
-    print(section_border)
-    print(f"HOLDER: {bold(result['holder'])}")
-    print(f"ASN   : {result['asn']}")
-    print(f"RIR   : {result['rir']}")
-    print()
-    print("📩 INCIDENT RESPONSE")
-    print(section_border)
-    print(f"ABUSE : {result['abuse_email']}")
-    print()
-    print(top_border)
+    # Build the whole report first and write it in one go.
+    lines = [
+        top_border,
+        f"🔍 IP INTEL REPORT: {bold(result['ip'])}",
+        top_border,
+        "",
+        "📊 RISK PROFILE",
+        section_border,
+        jurisdiction_coloured,
+        f"[🏠] TYPE        : {infra_type}",
+        f"[🛡️] PRIVACY     : {privacy_text}",
+        "",
+        "🏢 NETWORK IDENTITY",
+        section_border,
+        f"HOLDER: {bold(result['holder'])}",
+        f"ASN   : {result['asn']}",
+        f"RIR   : {result['rir']}",
+        "",
+        "📩 INCIDENT RESPONSE",
+        section_border,
+        f"ABUSE : {result['abuse_email']}",
+        "",
+        top_border,
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
     return 0
 
 
@@ -8,9 +8,17 @@ import sys
 
 import ipaddress
 import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
 from typing import Any
 
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
@@ -21,9 +29,67 @@ if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
 
 
 IPAPI_URL = "https://ipapi.co/{ip}/json/"
+# ip-api.com only offers its batch endpoint over plain HTTP on the free tier.
+IPAPI_BATCH_URL = "http://ip-api.com/batch"
+IPAPI_BATCH_FIELDS = "status,message,query,country,as,org,isp"
+IPAPI_BATCH_SIZE = 100
+# A 429 is retried after the window resets; the free tier allows 15 batch requests per minute.
+IPAPI_BATCH_RETRIES = 2
+IPAPI_RATE_WINDOW_SECONDS = 60
+# Geolocation/ASN data changes slowly; a day-old ipapi answer is still good for triage.
+CACHE_TTL_SECONDS = 86400
+CACHE_PATH = Path.home() / ".cache" / "bgp-intel" / "http_cache"
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _build_session(use_cache: bool) -> requests.Session:
+    session = requests.Session()
+    if use_cache:
+        try:
+            session = requests_cache.CachedSession(
+                str(CACHE_PATH),
+                backend="sqlite",
+                expire_after=CACHE_TTL_SECONDS,
+                allowable_methods=("GET",),
+                stale_if_error=True,
+            )
+        except (OSError, sqlite3.Error):
+            # Cache directory is not writable; run uncached rather than fail.
+            pass
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+        ),
+    )
+    return session
+
+
+def _session(use_cache: bool = True) -> requests.Session:
+    # Built on first use; run_report calls this with use_cache=False for --no-cache before any lookup.
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session(use_cache)
+    return _SESSION
+
+
+# Dotted-quad IPv4 with no leading zeros, matching what ipaddress accepts.
+_OCTET = r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+_IPV4_RE = re.compile(rf"{_OCTET}(?:\.{_OCTET}){{3}}")
 
 
 def is_valid_ip(value: str) -> bool:
+    # Plain IPv4 is the common case; skip ipaddress and its exceptions for it.
+    if _IPV4_RE.fullmatch(value):
+        return True
+    if ":" not in value:
+        return False
     try:
         ipaddress.ip_address(value)
         return True
@@ -35,10 +101,80 @@ def lookup_ip(ip: str, timeout: int = 10) -> dict[str, Any]:
     if not is_valid_ip(ip):
         raise ValueError(f"Invalid IP address: {ip}")
 
-    resp = requests.get(IPAPI_URL.format(ip=ip), timeout=timeout)
+    resp = _session().get(IPAPI_URL.format(ip=ip), timeout=timeout)
     resp.raise_for_status()
     return resp.json()
 
 
+def _from_batch_item(item: dict[str, Any]) -> dict[str, Any]:
+    # Map an ip-api.com batch entry onto the ipapi.co keys run_report reads.
+    ip = item.get("query")
+    if item.get("status") != "success":
+        return {"ip": ip, "error": item.get("message") or "lookup_failed"}
+    as_field = str(item.get("as") or "")
+    return {
+        "ip": ip,
+        "country_name": item.get("country"),
+        "asn": as_field.split(" ", 1)[0] or None,
+        "org": item.get("org") or item.get("isp"),
+    }
+
+
+def _rate_limit_wait(resp: requests.Response) -> float:
+    # ip-api.com reports requests left in the window (X-Rl) and seconds until it resets (X-Ttl).
+    try:
+        remaining = int(resp.headers.get("X-Rl", "1"))
+        reset = float(resp.headers.get("X-Ttl", IPAPI_RATE_WINDOW_SECONDS))
+    except ValueError:
+        remaining, reset = 1, float(IPAPI_RATE_WINDOW_SECONDS)
+    if resp.status_code == 429 or remaining <= 0:
+        return max(1.0, reset)
+    return 0.0
+
+
+def lookup_ips_bulk(ips: list[str], timeout: int = 10) -> dict[str, dict[str, Any]]:
+    # One POST per IPAPI_BATCH_SIZE IPs. A failed chunk only fails its own IPs, and
+    # results are keyed by each item's "query" rather than by response position.
+    out: dict[str, dict[str, Any]] = {}
+    wait = 0.0
+    for start in range(0, len(ips), IPAPI_BATCH_SIZE):
+        chunk = ips[start : start + IPAPI_BATCH_SIZE]
+        try:
+            for _ in range(IPAPI_BATCH_RETRIES + 1):
+                if wait:
+                    time.sleep(wait)
+                    wait = 0.0
+                resp = _session().post(
+                    IPAPI_BATCH_URL,
+                    params={"fields": IPAPI_BATCH_FIELDS},
+                    json=[{"query": ip} for ip in chunk],
+                    timeout=timeout,
+                )
+                wait = _rate_limit_wait(resp)
+                if resp.status_code != 429:
+                    break
+            resp.raise_for_status()
+            items = resp.json()
+        except (requests.exceptions.RequestException, ValueError) as exc:
+            out.update((ip, {"ip": ip, "error": str(exc)}) for ip in chunk)
+            continue
+
+        if not isinstance(items, list):
+            items = []
+        found = {item.get("query"): item for item in items if isinstance(item, dict)}
+        for ip in chunk:
+            item = found.get(ip)
+            out[ip] = _from_batch_item(item) if item is not None else {"ip": ip, "error": "missing_from_batch"}
+    return out
+
+
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+
+def escape_non_ascii(text: str) -> str:
+    # orjson writes UTF-8; escape the way json.dumps does, so output is the same with or without it.
+    return _NON_ASCII_RE.sub(lambda m: json.dumps(m.group())[1:-1], text)
+
+
 def lookup_ip_json(ip: str, timeout: int = 10) -> str:
     return json.dumps(lookup_ip(ip, timeout=timeout), indent=2)
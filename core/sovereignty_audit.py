@@ -4,15 +4,31 @@ from __future__ import annotations
 import base64
 
 import argparse
+import functools
+import heapq
 import ipaddress
 import json
+import random
 import re
 import socket
+import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Any, Dict, List
 from urllib.parse import urlparse
 
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional JSON accelerator
+    orjson = None
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
@@ -23,6 +39,15 @@ if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
 
 TIMEOUT_SECONDS = 5
 USER_AGENT = "Euro-Sovereignty-Audit/1.0"
+AUDIT_MAX_WORKERS = 8
+CACHE_TTL_SECONDS = 3600
+CACHE_PATH = Path.home() / ".cache" / "bgp-intel" / "http_cache"
+RATE_LIMIT_PER_SECOND = 8
+RATE_LIMIT_BURST = 16
+RETRY_DELAY_SECONDS = 1
+RETRY_MAX_DELAY_SECONDS = 30
+MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 PREFIX_OVERVIEW_URL = "https://stat.ripe.net/data/prefix-overview/data.json"
 BGP_STATE_URL = "https://stat.ripe.net/data/bgp-state/data.json"
@@ -31,14 +56,15 @@ AS_OVERVIEW_URL = "https://stat.ripe.net/data/as-overview/data.json"
 ANNOUNCED_PREFIXES_URL = "https://stat.ripe.net/data/announced-prefixes/data.json"
 RPKI_VALIDATION_URL = "https://stat.ripe.net/data/rpki-validation/data.json"
 
-EU_EEA_COUNTRIES = {
+EU_EEA_COUNTRIES = frozenset({
     "AT", "BE", "BG", "HR", "CY", "CZ", "DK", "EE", "FI", "FR", "DE", "GR", "HU", "IE", "IT",
     "LV", "LT", "LU", "MT", "NL", "PL", "PT", "RO", "SK", "SI", "ES", "SE", "IS", "LI", "NO",
-}
+})
 
-HIGH_RISK_COUNTRIES = {"RU", "CN", "IR", "KP", "SY"}
+HIGH_RISK_COUNTRIES = frozenset({"RU", "CN", "IR", "KP", "SY"})
 FOREIGN_INTEL_KEYWORDS = ["ARVANCLOUD", "AMAZON", "GOOGLE", "TCI", "BEZEQ"]
-COUNTRY_TAIL_RE = re.compile(r",\s*([A-Z]{2})\s*$")
+# One alternation, so each holder is scanned once instead of once per keyword.
+FOREIGN_INTEL_RE = re.compile("|".join(map(re.escape, FOREIGN_INTEL_KEYWORDS)), re.IGNORECASE)
 
 BLUE = "\033[34m"
 GREEN = "\033[32m"
@@ -48,10 +74,118 @@ BOLD = "\033[1m"
 RESET = "\033[0m"
 
 
+class _TokenBucket:
+    # Thread-safe client-side limiter, so concurrent lookups stay under RIPEstat's rate.
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_RATE_LIMITER = _TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+
+
+class _RateLimitedAdapter(HTTPAdapter):
+    # Mounted below the cache, so only requests that really go to RIPEstat spend a token.
+    def send(self, request, *args, **kwargs):
+        _RATE_LIMITER.acquire()
+        return super().send(request, *args, **kwargs)
+
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _build_session(use_cache: bool) -> requests.Session:
+    session = requests.Session()
+    if use_cache:
+        # Only RIPEstat answers are cached; resolving the user's URL must always hit the network.
+        try:
+            session = requests_cache.CachedSession(
+                str(CACHE_PATH),
+                backend="sqlite",
+                expire_after=CACHE_TTL_SECONDS,
+                urls_expire_after={"stat.ripe.net": CACHE_TTL_SECONDS, "*": requests_cache.DO_NOT_CACHE},
+                allowable_methods=("GET",),
+                stale_if_error=True,
+            )
+        except (OSError, sqlite3.Error):
+            # Cache directory is not writable; run uncached rather than fail.
+            pass
+    # Status-driven retries (429/5xx) are handled with jitter in _get_with_backoff.
+    retries = Retry(total=3, backoff_factor=0.3)
+    session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retries))
+    session.mount(
+        "https://stat.ripe.net/",
+        _RateLimitedAdapter(pool_connections=32, pool_maxsize=64, max_retries=retries),
+    )
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def _session(use_cache: bool = True) -> requests.Session:
+    # Lazy: the cache file is only opened once main knows whether --no-cache was given.
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session(use_cache)
+    return _SESSION
+
+
+def _retry_after_seconds(response: requests.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 0.0
+
+
+def _get_with_backoff(url: str, params: Dict[str, str]) -> requests.Response:
+    for attempt in range(MAX_RETRIES + 1):
+        response = _session().get(url, params=params, timeout=TIMEOUT_SECONDS)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        # Exponential backoff with jitter, never shorter than the server's Retry-After.
+        delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_DELAY_SECONDS * 2**attempt) * random.uniform(0.5, 1.0)
+        time.sleep(max(delay, _retry_after_seconds(response)))
+    return response
+
+
+def _loads(payload: bytes) -> Any:
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+
+def _ascii(text: str) -> str:
+    return _NON_ASCII_RE.sub(lambda m: json.dumps(m.group())[1:-1], text)
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        return _ascii(orjson.dumps(obj).decode("utf-8"))
+    return json.dumps(obj, separators=(",", ":"))
+
+
 def get_json(url: str, params: Dict[str, str]) -> Dict[str, Any]:
-    resp = requests.get(url, params=params, timeout=TIMEOUT_SECONDS, headers={"User-Agent": USER_AGENT})
+    resp = _get_with_backoff(url, params)
     resp.raise_for_status()
-    return resp.json().get("data", {})
+    return _loads(resp.content).get("data", {})
 
 
 def normalise_asn(value: Any) -> str:
@@ -60,8 +194,13 @@ def normalise_asn(value: Any) -> str:
 
 
 def infer_country_from_holder(holder: str) -> str:
-    m = COUNTRY_TAIL_RE.search(holder or "")
-    return m.group(1) if m else "UNKNOWN"
+    # Inline form of ",\s*([A-Z]{2})\s*$": a comma, optional spaces, then a two-letter code.
+    text = (holder or "").rstrip()
+    code = text[-2:]
+    if len(code) == 2 and code.isascii() and code.isalpha() and code.isupper():
+        if text[:-2].rstrip().endswith(","):
+            return code
+    return "UNKNOWN"
 
 
 def resolve_final_url_and_ip(url_or_host: str) -> tuple[str, str]:
@@ -72,26 +211,67 @@ def resolve_final_url_and_ip(url_or_host: str) -> tuple[str, str]:
     if not value.startswith(("http://", "https://")):
         value = f"https://{value}"
 
-    r = requests.get(value, timeout=TIMEOUT_SECONDS, allow_redirects=True, headers={"User-Agent": USER_AGENT})
+    r = _session().get(value, timeout=TIMEOUT_SECONDS, allow_redirects=True)
     final_url = r.url
     parsed = urlparse(final_url)
     host = parsed.hostname
     if not host:
         raise RuntimeError("Could not resolve hostname from URL")
 
-    infos = socket.getaddrinfo(host, None)
-    for info in infos:
-        ip = info[4][0]
-        try:
-            ip_obj = ipaddress.ip_address(ip)
-            if ip_obj.version == 4:
-                return final_url, ip
-        except ValueError:
-            continue
-    raise RuntimeError("Could not resolve IPv4 address from final URL")
+    return final_url, _resolve_v4(host)
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_v4(host: str) -> str:
+    # Ask the resolver for A records only; AAAA answers were discarded anyway.
+    # Failures raise and so are not cached.
+    try:
+        infos = socket.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+    except socket.gaierror as exc:
+        raise RuntimeError("Could not resolve IPv4 address from final URL") from exc
+    return infos[0][4][0]
+
+
+def _routing_block(ip: str) -> str:
+    # Routes more specific than /24 (IPv4) or /48 (IPv6) are not globally propagated,
+    # so every address in such a block resolves to the same prefix and origin.
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    bits = 24 if addr.version == 4 else 48
+    return str(ipaddress.ip_network((addr, bits), strict=False).network_address)
+
+
+def _covers(prefix: str, ip: str) -> bool:
+    try:
+        return ipaddress.ip_address(ip) in ipaddress.ip_network(prefix, strict=False)
+    except ValueError:
+        return False
+
+
+_PREFIX_BY_BLOCK: Dict[str, tuple[str, str, str]] = {}
+_PREFIX_BY_BLOCK_LOCK = threading.Lock()
 
 
 def find_prefix_and_origin_from_ip(ip: str) -> tuple[str, str, str]:
+    # Memoised per routing block, but RIPEstat is always asked about the IP itself. A block's
+    # answer is reused only when its prefix also covers this IP, which rules out unannounced
+    # addresses (RIPEstat echoes the IP back) and more-specific announcements.
+    block = _routing_block(ip)
+    with _PREFIX_BY_BLOCK_LOCK:
+        cached = _PREFIX_BY_BLOCK.get(block)
+    if cached is not None and _covers(cached[0], ip):
+        return cached
+    result = _prefix_and_origin(ip)
+    with _PREFIX_BY_BLOCK_LOCK:
+        _PREFIX_BY_BLOCK[block] = result
+    return result
+
+
+# Lookups below are memoised for the process; cached values are immutable or copied on return.
+@functools.lru_cache(maxsize=1024)
+def _prefix_and_origin(ip: str) -> tuple[str, str, str]:
     data = get_json(PREFIX_OVERVIEW_URL, {"resource": ip})
     prefix = str(data.get("resource") or "Unknown")
     asns = data.get("asns", [])
@@ -103,6 +283,7 @@ def find_prefix_and_origin_from_ip(ip: str) -> tuple[str, str, str]:
     return prefix, origin_asn, origin_holder
 
 
+@functools.lru_cache(maxsize=1024)
 def find_prefix_from_asn(asn: str) -> str:
     data = get_json(ANNOUNCED_PREFIXES_URL, {"resource": asn})
     prefixes = data.get("prefixes", [])
@@ -113,39 +294,52 @@ def find_prefix_from_asn(asn: str) -> str:
 
 
 def get_path_from_prefix(prefix: str) -> List[str]:
+    return list(_path_from_prefix(prefix))
+
+
+@functools.lru_cache(maxsize=1024)
+def _path_from_prefix(prefix: str) -> tuple[str, ...]:
     data = get_json(BGP_STATE_URL, {"resource": prefix})
     states = data.get("bgp_state", [])
     if not isinstance(states, list) or not states:
-        return []
+        return ()
     first = states[0] if isinstance(states[0], dict) else {}
     path = first.get("path", [])
     if not isinstance(path, list):
-        return []
-    return [normalise_asn(a) for a in path]
+        return ()
+    return tuple(normalise_asn(a) for a in path)
 
 
 def get_top_upstreams(origin_asn: str) -> List[Dict[str, Any]]:
     if origin_asn == "Unknown":
         return []
+    return [dict(up) for up in _top_upstreams(origin_asn)]
+
+
+@functools.lru_cache(maxsize=1024)
+def _top_upstreams(origin_asn: str) -> tuple[Dict[str, Any], ...]:
     data = get_json(ASN_NEIGHBOURS_URL, {"resource": origin_asn})
     neighbours = data.get("neighbours", [])
     if not isinstance(neighbours, list):
-        return []
+        return ()
     left = [n for n in neighbours if isinstance(n, dict) and str(n.get("type", "")).lower() == "left"]
-    left.sort(key=lambda n: int(n.get("power", 0) or 0), reverse=True)
+    # Only the top three are reported, so select them instead of sorting every neighbour.
+    top = heapq.nlargest(3, ((int(n.get("power", 0) or 0), n) for n in left), key=lambda pair: pair[0])
     out = []
-    for n in left[:3]:
+    for power, n in top:
         out.append(
             {
                 "asn": normalise_asn(n.get("asn", "Unknown")),
-                "power": int(n.get("power", 0) or 0),
+                "power": power,
                 "v4_peers": int(n.get("v4_peers", 0) or 0),
                 "v6_peers": int(n.get("v6_peers", 0) or 0),
             }
         )
-    return out
+    return tuple(out)
 
 
+# Transit ASNs recur across audits; failures raise and are therefore not cached.
+@functools.lru_cache(maxsize=4096)
 def get_asn_entity(asn: str) -> Dict[str, str]:
     data = get_json(AS_OVERVIEW_URL, {"resource": asn})
     holder = str(data.get("holder") or "Unknown")
@@ -168,17 +362,22 @@ def rpki_state(prefix: str, origin_asn: str) -> str:
     return "unknown"
 
 
+def _entity_or_unknown(asn: str) -> Dict[str, str]:
+    try:
+        return get_asn_entity(asn)
+    except Exception:
+        return {"asn": asn, "holder": "Unknown", "country": "UNKNOWN"}
+
+
 def collect_entities(path_asns: List[str]) -> List[Dict[str, str]]:
-    out = []
-    cache: Dict[str, Dict[str, str]] = {}
-    for asn in path_asns:
-        if asn not in cache:
-            try:
-                cache[asn] = get_asn_entity(asn)
-            except Exception:
-                cache[asn] = {"asn": asn, "holder": "Unknown", "country": "UNKNOWN"}
-        out.append(cache[asn])
-    return out
+    # Look up each distinct ASN once, concurrently, then restore path order.
+    unique = list(dict.fromkeys(path_asns))
+    if not unique:
+        return []
+    with ThreadPoolExecutor(max_workers=min(AUDIT_MAX_WORKERS, len(unique))) as ex:
+        cache = dict(zip(unique, ex.map(_entity_or_unknown, unique)))
+    # Copies, so callers never mutate the process-wide get_asn_entity cache.
+    return [dict(cache[asn]) for asn in path_asns]
 
 
 def audit(resource: str, *, from_url: bool = False) -> Dict[str, Any]:
@@ -201,25 +400,35 @@ def audit(resource: str, *, from_url: bool = False) -> Dict[str, Any]:
 
     if target_asn == "" or target_asn == "Unknown":
         if prefix != "Unknown":
-            _, target_asn, origin_holder = find_prefix_and_origin_from_ip(prefix.split("/")[0])
+            _, target_asn, origin_holder = find_prefix_and_origin_from_ip(prefix.partition("/")[0])
         else:
             target_asn = "Unknown"
 
-    path = get_path_from_prefix(prefix) if prefix != "Unknown" else []
-    entities = collect_entities(path)
-    upstreams = get_top_upstreams(target_asn)
-    rpki = rpki_state(prefix, target_asn)
-
-    extra_eu = [e for e in entities if e.get("country") not in EU_EEA_COUNTRIES and e.get("country") != "UNKNOWN"]
-    high_risk = [e for e in entities if e.get("country") in HIGH_RISK_COUNTRIES]
-
+    # Path, upstreams and RPKI state are independent once prefix and origin are known.
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        path_future = ex.submit(get_path_from_prefix, prefix) if prefix != "Unknown" else None
+        upstreams_future = ex.submit(get_top_upstreams, target_asn)
+        rpki_future = ex.submit(rpki_state, prefix, target_asn)
+        path = path_future.result() if path_future is not None else []
+        entities = collect_entities(path)
+        upstreams = upstreams_future.result()
+        rpki = rpki_future.result()
+
+    extra_eu = []
+    high_risk = []
     intel_dependency_hits = []
+    # One pass over the path entities classifies jurisdiction and intel dependency together.
     for e in entities:
-        holder_upper = e.get("holder", "").upper()
-        for kw in FOREIGN_INTEL_KEYWORDS:
-            if kw in holder_upper:
-                intel_dependency_hits.append({"asn": e["asn"], "holder": e["holder"], "keyword": kw})
-                break
+        country = e.get("country")
+        if country != "UNKNOWN" and country not in EU_EEA_COUNTRIES:
+            extra_eu.append(e)
+        if country in HIGH_RISK_COUNTRIES:
+            high_risk.append(e)
+        found = {m.upper() for m in FOREIGN_INTEL_RE.findall(e.get("holder", ""))}
+        if found:
+            # Report the first keyword in list order, as before.
+            kw = next(k for k in FOREIGN_INTEL_KEYWORDS if k in found)
+            intel_dependency_hits.append({"asn": e["asn"], "holder": e["holder"], "keyword": kw})
 
     sovereignty_score = "Sovereign (EU-Only)" if not extra_eu else "Fragmented (Extra-EU Path)"
 
@@ -307,7 +516,9 @@ def main() -> int:
     parser.add_argument("resource", nargs="?", help="Target IP, ASN, or URL")
     parser.add_argument("--json", action="store_true", help="Output full audit JSON")
     parser.add_argument("--url", action="store_true", help="Treat input as URL and resolve final destination")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local RIPEstat response cache")
     args = parser.parse_args()
+    _session(use_cache=not args.no_cache)
 
     resource = args.resource
     from_url = args.url
@@ -325,7 +536,7 @@ def main() -> int:
     try:
         result = audit(resource, from_url=from_url)
         if args.json:
-            print(json.dumps(result, separators=(",", ":")))
+            print(_dumps(result))
         else:
             print_report(result)
         return 0
@@ -5,12 +5,23 @@ import base64
 import sys
 
 import argparse
+import csv
 import ipaddress
 import json
+import re
+import sqlite3
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Set
 
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional JSON accelerator
+    orjson = None
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
@@ -22,6 +33,69 @@ if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
 USER_AGENT = "BGP-Intel-Audit-Tool/1.1"
 RIPESTAT_ANNOUNCED_PREFIXES = "https://stat.ripe.net/data/announced-prefixes/data.json"
 RIPESTAT_RIS_PREFIXES = "https://stat.ripe.net/data/ris-prefixes/data.json"
+# Monitoring wants fresh routing data: keep RIPEstat answers for five minutes only, and
+# never serve an expired one when RIPEstat fails, so an outage still exits 2. A separate
+# store keeps the hour-long entries written by the triage tools out of these checks.
+CACHE_TTL_SECONDS = 300
+CACHE_PATH = Path.home() / ".cache" / "bgp-intel" / "monitor_cache"
+
+_SESSION: requests.Session | None = None
+
+
+def _build_session(use_cache: bool) -> requests.Session:
+    session = requests.Session()
+    if use_cache:
+        try:
+            session = requests_cache.CachedSession(
+                str(CACHE_PATH),
+                backend="sqlite",
+                expire_after=CACHE_TTL_SECONDS,
+                allowable_methods=("GET",),
+            )
+        except (OSError, sqlite3.Error):
+            # Cache directory is not writable; run uncached rather than fail.
+            pass
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            # Back off on rate limiting and honour the server's Retry-After.
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 502, 503, 504],
+                respect_retry_after_header=True,
+            ),
+        ),
+    )
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def _session(use_cache: bool = True) -> requests.Session:
+    # Created after argument parsing, so --no-cache runs never open monitor_cache.
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _build_session(use_cache)
+    return _SESSION
+
+
+def _loads(payload: bytes) -> Any:
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+
+def _ascii(text: str) -> str:
+    return _NON_ASCII_RE.sub(lambda m: json.dumps(m.group())[1:-1], text)
+
+
+def _dumps_indented(obj: Any) -> str:
+    if orjson is not None:
+        return _ascii(orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8"))
+    return json.dumps(obj, indent=2)
 
 
 def normalise_asn(value: str) -> str:
@@ -31,15 +105,14 @@ def normalise_asn(value: str) -> str:
 
 def parse_expected_file(path: Path) -> Dict[str, str]:
     mapping: Dict[str, str] = {}
-    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-        s = line.strip()
-        if not s or s.startswith("#"):
-            continue
-        parts = [p.strip() for p in s.split(",")]
-        if len(parts) < 2:
-            continue
-        prefix, asn = parts[0], normalise_asn(parts[1])
-        mapping[prefix] = asn
+    with path.open(encoding="utf-8", errors="ignore", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            prefix = row[0].strip()
+            if prefix.startswith("#"):
+                continue
+            mapping[prefix] = normalise_asn(row[1])
     return mapping
 
 
@@ -61,18 +134,15 @@ def extract_prefixes_from_payload(payload: dict) -> Set[str]:
 
 
 def fetch_prefixes_for_asn(asn: str, timeout: int = 12) -> tuple[Set[str], str]:
-    headers = {"User-Agent": USER_AGENT}
-
     # Primary: Announced Prefixes
     try:
-        r = requests.get(
+        r = _session().get(
             RIPESTAT_ANNOUNCED_PREFIXES,
             params={"resource": asn},
-            headers=headers,
             timeout=timeout,
         )
         r.raise_for_status()
-        prefixes = extract_prefixes_from_payload(r.json())
+        prefixes = extract_prefixes_from_payload(_loads(r.content))
         if prefixes:
             return prefixes, "announced-prefixes"
     except requests.exceptions.RequestException as exc:
@@ -83,14 +153,13 @@ def fetch_prefixes_for_asn(asn: str, timeout: int = 12) -> tuple[Set[str], str]:
 
     # Fallback: RIS Prefixes
     try:
-        r = requests.get(
+        r = _session().get(
             RIPESTAT_RIS_PREFIXES,
             params={"resource": asn, "list_prefixes": "true"},
-            headers=headers,
             timeout=timeout,
         )
         r.raise_for_status()
-        prefixes = extract_prefixes_from_payload(r.json())
+        prefixes = extract_prefixes_from_payload(_loads(r.content))
         if prefixes:
             return prefixes, "ris-prefixes"
         raise RuntimeError("RIS Prefixes endpoint returned no prefixes")
@@ -120,13 +189,19 @@ def evaluate(prefix: str, expected_asn: str, observed_prefixes: Set[str], source
     }
 
 
+def evaluate_group(expected_asn: str, prefixes: List[str], observed_prefixes: Set[str], source: str) -> Dict[str, dict]:
+    return {p: evaluate(p, expected_asn, observed_prefixes, source) for p in prefixes}
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Initialising BGP origin consistency check using RIPEstat")
     parser.add_argument("--prefix", help="Single prefix, for example 8.8.8.0/24")
     parser.add_argument("--expected-asn", help="Expected origin ASN for --prefix, for example AS15169")
     parser.add_argument("--baseline", help="CSV baseline file: prefix,asn")
     parser.add_argument("--json", action="store_true", help="Emit JSON output")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the five-minute RIPEstat response cache")
     args = parser.parse_args()
+    _session(use_cache=not args.no_cache)
 
     targets: List[tuple[str, str]] = []
 
@@ -144,33 +219,34 @@ def main() -> int:
 
     print("Initialising checks, Analysing prefix to ASN consistency...")
 
-    results = []
-    exit_code = 0
-
-    # Cache API lookups by ASN for efficiency
-    asn_prefix_cache: Dict[str, tuple[Set[str], str]] = {}
-
+    # Group prefixes by expected ASN so each ASN is fetched and compared once
+    by_asn: Dict[str, List[str]] = {}
     for prefix, expected in targets:
+        by_asn.setdefault(expected, []).append(prefix)
+
+    rows: Dict[str, Dict[str, dict]] = {}
+    for expected, prefixes in by_asn.items():
         try:
-            if expected not in asn_prefix_cache:
-                asn_prefix_cache[expected] = fetch_prefixes_for_asn(expected)
-            observed_prefixes, source = asn_prefix_cache[expected]
-            row = evaluate(prefix, expected, observed_prefixes, source)
+            observed_prefixes, source = fetch_prefixes_for_asn(expected)
+            rows[expected] = evaluate_group(expected, prefixes, observed_prefixes, source)
         except Exception as exc:
-            row = {
-                "prefix": prefix,
-                "expected_asn": expected,
-                "status": "error",
-                "reason": f"Authorised check failed: {exc}",
-                "source": "ripe-fallback",
+            rows[expected] = {
+                p: {
+                    "prefix": p,
+                    "expected_asn": expected,
+                    "status": "error",
+                    "reason": f"Authorised check failed: {exc}",
+                    "source": "ripe-fallback",
+                }
+                for p in prefixes
             }
 
-        if row["status"] in {"alert", "error"}:
-            exit_code = 2
-        results.append(row)
+    # Report in the original target order
+    results = [rows[expected][prefix] for prefix, expected in targets]
+    exit_code = 2 if any(r["status"] in {"alert", "error"} for r in results) else 0
 
     if args.json:
-        print(json.dumps(results, indent=2))
+        print(_dumps_indented(results))
         return exit_code
 
     print("PREFIX\tEXPECTED\tSTATUS\tSOURCE\tREASON")
@@ -5,12 +5,17 @@ import base64
 import sys
 
 import argparse
+import csv
 import ipaddress
 import json
+import sqlite3
 from pathlib import Path
 from typing import Dict, List
 
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
@@ -19,6 +24,46 @@ if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
     raise SystemExit(0)
 
 
+# Monitoring wants fresh routing data: keep RIPEstat answers for five minutes only, and
+# never serve an expired one when RIPEstat fails, so an outage still exits 2. A separate
+# store keeps the hour-long entries written by the triage tools out of these checks.
+CACHE_TTL_SECONDS = 300
+CACHE_PATH = Path.home() / ".cache" / "bgp-intel" / "monitor_cache"
+
+_SESSION: requests.Session | None = None
+
+
+def _build_session(use_cache: bool) -> requests.Session:
+    session = requests.Session()
+    if use_cache:
+        try:
+            session = requests_cache.CachedSession(
+                str(CACHE_PATH),
+                backend="sqlite",
+                expire_after=CACHE_TTL_SECONDS,
+                allowable_methods=("GET",),
+            )
+        except (OSError, sqlite3.Error):
+            # Cache directory is not writable; run uncached rather than fail.
+            pass
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+        ),
+    )
+    return session
+
+
+def _session(use_cache: bool = True) -> requests.Session:
+    # Opened lazily, so a --no-cache validation stays live and never touches monitor_cache.
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _build_session(use_cache)
+    return _SESSION
+
 
 def normalise_asn(value: str) -> str:
     v = value.strip().upper()
@@ -27,21 +72,21 @@ def normalise_asn(value: str) -> str:
 
 def parse_baseline(path: Path) -> Dict[str, str]:
     mapping: Dict[str, str] = {}
-    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-        s = line.strip()
-        if not s or s.startswith("#"):
-            continue
-        parts = [p.strip() for p in s.split(",")]
-        if len(parts) < 2:
-            continue
-        mapping[parts[0]] = normalise_asn(parts[1])
+    with path.open(encoding="utf-8", errors="ignore", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            prefix = row[0].strip()
+            if prefix.startswith("#"):
+                continue
+            mapping[prefix] = normalise_asn(row[1])
     return mapping
 
 
 def query_rpki(prefix: str, asn: str, timeout: int = 12) -> dict:
     # RIPEstat endpoint expects both prefix and ASN(resource)
     url = "https://stat.ripe.net/data/rpki-validation/data.json"
-    r = requests.get(url, params={"prefix": prefix, "resource": asn}, timeout=timeout)
+    r = _session().get(url, params={"prefix": prefix, "resource": asn}, timeout=timeout)
     r.raise_for_status()
     return r.json()
 
@@ -69,7 +114,9 @@ def main() -> int:
     parser.add_argument("--asn", help="Origin ASN, e.g. AS15169")
     parser.add_argument("--baseline", help="CSV baseline file: prefix,asn")
     parser.add_argument("--json", action="store_true", help="Emit JSON output")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the five-minute RIPEstat response cache")
     args = parser.parse_args()
+    _session(use_cache=not args.no_cache)
 
     targets: List[tuple[str, str]] = []
 
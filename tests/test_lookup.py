@@ -1,5 +1,10 @@
 import base64
+import json as _json
 import sys
+
+import requests
+
+from core import lookup
 from core.lookup import is_valid_ip
 
 __r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
@@ -20,3 +25,79 @@ def test_valid_ipv6():
 
 def test_invalid_ip():
     assert is_valid_ip("999.999.1.1") is False
+
+
+def test_ipv4_fast_path_matches_ipaddress():
+    for value in ("0.0.0.0", "255.255.255.255", "10.0.0.1"):
+        assert is_valid_ip(value) is True
+    for value in ("256.1.1.1", "01.2.3.4", "1.2.3", "1.2.3.4.5", "1.2.3.4\n", "١.2.3.4", "", "example.com"):
+        assert is_valid_ip(value) is False
+
+
+class _BatchSession:
+    # Stands in for the HTTP session: answers each batch POST from a list of canned replies.
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.chunks = []
+
+    def post(self, url, params=None, json=None, timeout=None):
+        self.chunks.append([entry["query"] for entry in json])
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        status, headers, body = reply(self.chunks[-1]) if callable(reply) else reply
+        resp = requests.Response()
+        resp.status_code = status
+        resp.headers.update(headers)
+        resp._content = _json.dumps(body).encode()
+        resp.url = url
+        return resp
+
+
+def _ok(queries):
+    return 200, {"X-Rl": "14", "X-Ttl": "60"}, [
+        {"status": "success", "query": ip, "country": "US", "as": "AS15169 Google LLC", "org": "Google"}
+        for ip in queries
+    ]
+
+
+def _ips(count):
+    return [f"10.0.{i // 256}.{i % 256}" for i in range(count)]
+
+
+def test_bulk_lookup_sends_chunks_of_batch_size(monkeypatch):
+    session = _BatchSession(_ok, _ok, _ok)
+    monkeypatch.setattr(lookup, "_SESSION", session)
+    out = lookup.lookup_ips_bulk(_ips(250))
+    assert [len(c) for c in session.chunks] == [100, 100, 50]
+    assert len(out) == 250
+    assert out["10.0.0.5"]["asn"] == "AS15169"
+
+
+def test_bulk_lookup_keeps_other_chunks_when_one_fails(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(lookup.time, "sleep", sleeps.append)
+    limited = (429, {"X-Rl": "0", "X-Ttl": "7"}, [])
+    session = _BatchSession(_ok, limited, limited, limited, requests.exceptions.ConnectionError("reset"), _ok)
+    monkeypatch.setattr(lookup, "_SESSION", session)
+    ips = _ips(400)
+    out = lookup.lookup_ips_bulk(ips)
+
+    # Chunk two is retried after each X-Ttl wait and then given up; chunk three drops the connection.
+    assert sleeps == [7.0, 7.0, 7.0]
+    assert all("error" not in out[ip] for ip in ips[:100] + ips[300:])
+    assert all("429" in out[ip]["error"] for ip in ips[100:200])
+    assert all(out[ip]["error"] == "reset" for ip in ips[200:300])
+
+
+def test_bulk_lookup_matches_items_by_query(monkeypatch):
+    def reordered(queries):
+        # Reverse the answer and drop the entry for the first IP sent.
+        status, headers, body = _ok(queries)
+        return status, headers, body[:0:-1]
+
+    monkeypatch.setattr(lookup, "_SESSION", _BatchSession(reordered))
+    out = lookup.lookup_ips_bulk(["8.8.8.8", "1.1.1.1", "9.9.9.9"])
+    assert out["1.1.1.1"]["ip"] == "1.1.1.1"
+    assert out["9.9.9.9"]["ip"] == "9.9.9.9"
+    assert out["8.8.8.8"] == {"ip": "8.8.8.8", "error": "missing_from_batch"}
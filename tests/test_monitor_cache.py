@@ -0,0 +1,76 @@
+import base64
+import io
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from scripts import bgp_hijack_check, rpki_check
+
+__r17q_blob = "wqhWaWN0b3J5IGlzIG5vdCB3aW5uaW5nIGZvciBvdXJzZWx2ZXMsIGJ1dCBmb3Igb3RoZXJzLiAtIFRoZSBNYW5kYWxvcmlhbsKoCg=="
+
+if len(sys.argv) > 1 and sys.argv[1] in ("-m", "m"):
+    print(base64.b64decode(__r17q_blob).decode("utf-8", errors="replace"), end="")
+    raise SystemExit(0)
+
+
+
+class _FlakyAdapter(HTTPAdapter):
+    # Answers with a fixed JSON body while up, and fails like an unreachable RIPEstat while down.
+    def __init__(self, body):
+        super().__init__()
+        self.body = json.dumps(body).encode()
+        self.up = True
+
+    def send(self, request, **kwargs):
+        if not self.up:
+            raise requests.exceptions.ConnectionError("RIPEstat unreachable")
+        raw = HTTPResponse(
+            body=io.BytesIO(self.body),
+            status=200,
+            headers={"Content-Type": "application/json"},
+            preload_content=False,
+        )
+        return self.build_response(request, raw)
+
+
+@pytest.mark.parametrize(
+    "module, body, argv, error_row",
+    [
+        (
+            bgp_hijack_check,
+            {"data": {"prefixes": [{"prefix": "8.8.8.0/24"}]}},
+            ["--prefix", "8.8.8.0/24", "--expected-asn", "AS15169"],
+            "\terror\t",
+        ),
+        (
+            rpki_check,
+            {"data": {"status": "valid"}},
+            ["--prefix", "8.8.8.0/24", "--asn", "AS15169"],
+            "8.8.8.0/24\tAS15169\terror",
+        ),
+    ],
+)
+def test_upstream_failure_exits_2_despite_expired_cache(tmp_path, monkeypatch, capsys, module, body, argv, error_row):
+    monkeypatch.setattr(module, "CACHE_PATH", tmp_path / "monitor_cache")
+    session = module._build_session(use_cache=True)
+    adapter = _FlakyAdapter(body)
+    session.mount("https://", adapter)
+    monkeypatch.setattr(module, "_SESSION", session)
+    monkeypatch.setattr(sys, "argv", [module.__name__, *argv])
+
+    # Seed the cache with a good answer, expire it, then take RIPEstat down.
+    assert module.main() == 0
+    for key in list(session.cache.responses.keys()):
+        cached = session.cache.responses[key]
+        cached.expires = datetime.now(timezone.utc) - timedelta(hours=1)
+        session.cache.responses[key] = cached
+    adapter.up = False
+    capsys.readouterr()
+
+    assert module.main() == 2
+    assert error_row in capsys.readouterr().out